@@ -2,10 +2,12 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
-from database import Base
+from database import Base, DATABASE_URL
 import models  # noqa: F401 - needed to register models
 
 config = context.config
+# DATABASE_URL from the environment wins over alembic.ini
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
@@ -0,0 +1,21 @@
+"""Composite index for keyset-paginated history
+
+Revision ID: 002_history_index
+Revises: 001_initial
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '002_history_index'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sessions_created_at_id', 'sessions', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_created_at_id', table_name='sessions')
@@ -0,0 +1,69 @@
+"""Denormalized pause and duration columns on sessions
+
+Revision ID: 003_session_duration_columns
+Revises: 002_history_index
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '003_session_duration_columns'
+down_revision: Union[str, None] = '002_history_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FINAL_STATUSES = ('completed', 'interrupted', 'abandoned', 'overdue')
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sessions') as batch:
+        batch.add_column(sa.Column('pause_count', sa.Integer(), nullable=False, server_default='0'))
+        batch.add_column(sa.Column('total_paused_seconds', sa.Float(), nullable=False, server_default='0'))
+        batch.add_column(sa.Column('actual_duration_seconds', sa.Float(), nullable=True))
+    op.create_index('ix_sessions_actual_duration_seconds', 'sessions', ['actual_duration_seconds'])
+
+    # backfill in python so the interval math is the same on every backend
+    conn = op.get_bind()
+    sessions = sa.table(
+        'sessions',
+        sa.column('id', sa.Integer), sa.column('status', sa.String),
+        sa.column('start_time', sa.DateTime), sa.column('end_time', sa.DateTime),
+        sa.column('pause_count', sa.Integer), sa.column('total_paused_seconds', sa.Float),
+        sa.column('actual_duration_seconds', sa.Float),
+    )
+    interruptions = sa.table(
+        'interruptions',
+        sa.column('session_id', sa.Integer),
+        sa.column('pause_time', sa.DateTime), sa.column('resume_time', sa.DateTime),
+    )
+
+    pauses = {}
+    for row in conn.execute(sa.select(interruptions)):
+        pauses.setdefault(row.session_id, []).append(row)
+
+    for row in conn.execute(sa.select(sessions.c.id, sessions.c.status,
+                                      sessions.c.start_time, sessions.c.end_time)).all():
+        ints = pauses.get(row.id, [])
+        paused = 0.0
+        for i in ints:
+            # open pauses on live sessions are added on resume/complete
+            if i.resume_time is None and row.end_time is None:
+                continue
+            paused += ((i.resume_time or row.end_time) - i.pause_time).total_seconds()
+        actual = None
+        if row.status in FINAL_STATUSES and row.start_time and row.end_time:
+            actual = max((row.end_time - row.start_time).total_seconds() - paused, 0)
+        conn.execute(
+            sessions.update().where(sessions.c.id == row.id).values(
+                pause_count=len(ints), total_paused_seconds=paused, actual_duration_seconds=actual
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_actual_duration_seconds', table_name='sessions')
+    with op.batch_alter_table('sessions') as batch:
+        batch.drop_column('actual_duration_seconds')
+        batch.drop_column('total_paused_seconds')
+        batch.drop_column('pause_count')
@@ -0,0 +1,26 @@
+"""Partial index on open interruptions
+
+Revision ID: 004_open_interruption_index
+Revises: 003_session_duration_columns
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004_open_interruption_index'
+down_revision: Union[str, None] = '003_session_duration_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_interruptions_open', 'interruptions', ['session_id'],
+        sqlite_where=sa.text('resume_time IS NULL'),
+        postgresql_where=sa.text('resume_time IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interruptions_open', table_name='interruptions')
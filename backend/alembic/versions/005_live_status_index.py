@@ -0,0 +1,28 @@
+"""Partial index on live session statuses
+
+Revision ID: 005_live_status_index
+Revises: 004_open_interruption_index
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '005_live_status_index'
+down_revision: Union[str, None] = '004_open_interruption_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = "status IN ('scheduled','active','paused')"
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_sessions_live_status', 'sessions', ['status'],
+        sqlite_where=sa.text(LIVE),
+        postgresql_where=sa.text(LIVE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_live_status', table_name='sessions')
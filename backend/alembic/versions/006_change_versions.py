@@ -0,0 +1,44 @@
+"""Change versions on sessions for delta sync
+
+Revision ID: 006_change_versions
+Revises: 005_live_status_index
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006_change_versions'
+down_revision: Union[str, None] = '005_live_status_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sessions') as batch:
+        batch.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+        batch.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_sessions_version', 'sessions', ['version'])
+
+    counter = op.create_table(
+        'change_counter',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False),
+    )
+
+    # existing rows get their id as version, which is unique and already ordered
+    op.execute(
+        "UPDATE sessions SET version = id, "
+        "updated_at = COALESCE(end_time, start_time, created_at)"
+    )
+    conn = op.get_bind()
+    high_water = conn.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM sessions")).scalar()
+    op.bulk_insert(counter, [{'id': 1, 'value': high_water}])
+
+
+def downgrade() -> None:
+    op.drop_table('change_counter')
+    op.drop_index('ix_sessions_version', table_name='sessions')
+    with op.batch_alter_table('sessions') as batch:
+        batch.drop_column('updated_at')
+        batch.drop_column('version')
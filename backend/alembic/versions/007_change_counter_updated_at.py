@@ -0,0 +1,25 @@
+"""Last write time on the change counter
+
+Revision ID: 007_change_counter_updated_at
+Revises: 006_change_versions
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '007_change_counter_updated_at'
+down_revision: Union[str, None] = '006_change_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('change_counter') as batch:
+        batch.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE change_counter SET updated_at = (SELECT MAX(updated_at) FROM sessions)")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('change_counter') as batch:
+        batch.drop_column('updated_at')
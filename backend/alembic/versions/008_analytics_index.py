@@ -0,0 +1,24 @@
+"""Covering index for analytics range scans
+
+Revision ID: 008_analytics_index
+Revises: 007_change_counter_updated_at
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '008_analytics_index'
+down_revision: Union[str, None] = '007_change_counter_updated_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_sessions_start_time_stats', 'sessions',
+        ['start_time', 'status', 'actual_duration_seconds', 'pause_count'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_start_time_stats', table_name='sessions')
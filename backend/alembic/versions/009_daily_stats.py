@@ -0,0 +1,46 @@
+"""Daily rollup of finalized sessions
+
+Revision ID: 009_daily_stats
+Revises: 008_analytics_index
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '009_daily_stats'
+down_revision: Union[str, None] = '008_analytics_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_stats',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('focus_seconds', sa.Float(), nullable=False),
+        sa.Column('pauses', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('interrupted', sa.Integer(), nullable=False),
+        sa.Column('abandoned', sa.Integer(), nullable=False),
+        sa.Column('overdue', sa.Integer(), nullable=False),
+    )
+    op.execute("""
+        INSERT INTO daily_stats
+            (day, sessions, focus_seconds, pauses, completed, interrupted, abandoned, overdue)
+        SELECT date(start_time), COUNT(*),
+               COALESCE(SUM(actual_duration_seconds), 0), COALESCE(SUM(pause_count), 0),
+               SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'interrupted' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'abandoned' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'overdue' THEN 1 ELSE 0 END)
+        FROM sessions
+        WHERE start_time IS NOT NULL
+          AND status IN ('completed', 'interrupted', 'abandoned', 'overdue')
+        GROUP BY date(start_time)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_stats')
@@ -0,0 +1,75 @@
+"""Pause reason dictionary referenced by interruptions
+
+Revision ID: 010_pause_reasons
+Revises: 009_daily_stats
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '010_pause_reasons'
+down_revision: Union[str, None] = '009_daily_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalize_reason(text: str) -> str:
+    # frozen copy of models.normalize_reason
+    return " ".join(text.split()).casefold()
+
+
+def upgrade() -> None:
+    reasons = op.create_table(
+        'pause_reasons',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('key', sa.String(), nullable=False, unique=True),
+        sa.Column('label', sa.String(), nullable=False),
+    )
+    conn = op.get_bind()
+
+    # keys are case-folded in Python (SQLite's lower() is ASCII-only); the
+    # distinct texts are few compared to the rows, so map them via a temp table.
+    # Each key is labelled with its first spelling in interruption order.
+    texts = [row[0] for row in conn.execute(
+        sa.text("SELECT reason FROM interruptions GROUP BY reason ORDER BY min(id)")
+    )]
+    labels = {}
+    for text in texts:
+        labels.setdefault(normalize_reason(text), " ".join(text.split()))
+    op.bulk_insert(reasons, [{'key': key, 'label': label} for key, label in labels.items()])
+    ids = dict(conn.execute(sa.text("SELECT key, id FROM pause_reasons")).all())
+
+    reason_map = op.create_table(
+        'tmp_reason_map',
+        sa.Column('reason', sa.String(), primary_key=True),
+        sa.Column('reason_id', sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(reason_map, [{'reason': text, 'reason_id': ids[normalize_reason(text)]} for text in texts])
+
+    with op.batch_alter_table('interruptions') as batch:
+        batch.add_column(sa.Column('reason_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE interruptions SET reason_id = "
+        "(SELECT reason_id FROM tmp_reason_map WHERE tmp_reason_map.reason = interruptions.reason)"
+    )
+    op.drop_table('tmp_reason_map')
+
+    with op.batch_alter_table('interruptions') as batch:
+        batch.alter_column('reason_id', existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key('fk_interruptions_reason_id', 'pause_reasons', ['reason_id'], ['id'])
+        batch.drop_column('reason')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('interruptions') as batch:
+        batch.add_column(sa.Column('reason', sa.String(), nullable=True))
+    op.execute(
+        "UPDATE interruptions SET reason = "
+        "(SELECT label FROM pause_reasons WHERE pause_reasons.id = interruptions.reason_id)"
+    )
+    with op.batch_alter_table('interruptions') as batch:
+        batch.alter_column('reason', existing_type=sa.String(), nullable=False)
+        batch.drop_constraint('fk_interruptions_reason_id', type_='foreignkey')
+        batch.drop_column('reason_id')
+    op.drop_table('pause_reasons')
@@ -0,0 +1,36 @@
+"""Store sessions.created_at in one text format on SQLite
+
+Revision ID: 011_canonical_created_at
+Revises: 010_pause_reasons
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '011_canonical_created_at'
+down_revision: Union[str, None] = '010_pause_reasons'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# frozen copy of models.CREATED_AT_TRIGGER
+CREATED_AT_TRIGGER = """
+CREATE TRIGGER sessions_created_at_micros AFTER INSERT ON sessions
+WHEN length(NEW.created_at) = 19
+BEGIN
+    UPDATE sessions SET created_at = NEW.created_at || '.000000' WHERE id = NEW.id;
+END
+"""
+
+
+def upgrade() -> None:
+    # pad existing whole-second values; the trigger pads rows inserted later
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("UPDATE sessions SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
+    op.execute(CREATED_AT_TRIGGER)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS sessions_created_at_micros")
@@ -0,0 +1,26 @@
+"""Drop the analytics covering index now that summaries read daily_stats
+
+Revision ID: 012_drop_analytics_index
+Revises: 011_canonical_created_at
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '012_drop_analytics_index'
+down_revision: Union[str, None] = '011_canonical_created_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the rebuild scans every session anyway and the heatmap walks them by id,
+    # so the index only added a write to every completion
+    op.drop_index('ix_sessions_start_time_stats', table_name='sessions')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_sessions_start_time_stats', 'sessions',
+        ['start_time', 'status', 'actual_duration_seconds', 'pause_count'],
+    )
@@ -0,0 +1,279 @@
+"""
+Aggregate queries behind the /analytics endpoints.
+
+Everything here is computed by the database with GROUP BY, or, for the
+heatmap, by NumPy over streamed raw column chunks; no ORM objects are loaded.
+Summaries read the daily_stats rollup, which `python -m analytics rebuild`
+recomputes from the sessions table.
+"""
+import argparse
+import gc
+import heapq
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import String, case, delete, func, insert, select, type_coerce
+from sqlalchemy.orm import Session as DbSession
+
+from crud import DAILY_STATS_COUNTERS, FINAL_STATUSES
+from models import DailyStats, Interruption, PauseReason, Session
+from schemas import Granularity
+
+
+def period_start(column, granularity: Granularity, dialect: str):
+    """SQL expression for the 'YYYY-MM-DD' start of the day/week/month containing `column`."""
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(granularity, column), "YYYY-MM-DD")
+    if granularity == "day":
+        return func.date(column)
+    if granularity == "week":
+        # ISO weeks start on Monday: forward to Sunday, then back six days
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", column)
+
+
+def session_day_totals():
+    """daily_stats rows computed from scratch from the sessions table."""
+    day = func.date(Session.start_time).label("day")
+    per_status = [
+        func.sum(case((Session.status == status, 1), else_=0)).label(status) for status in FINAL_STATUSES
+    ]
+    return (
+        select(
+            day,
+            func.count().label("sessions"),
+            func.coalesce(func.sum(Session.actual_duration_seconds), 0).label("focus_seconds"),
+            func.coalesce(func.sum(Session.pause_count), 0).label("pauses"),
+            *per_status,
+        )
+        .where(Session.start_time.is_not(None), Session.status.in_(FINAL_STATUSES))
+        .group_by(day)
+    )
+
+
+def rebuild_daily_stats(db: DbSession) -> int:
+    """Replace daily_stats with a fresh aggregate of sessions, in the caller's transaction; returns the day count."""
+    db.execute(delete(DailyStats))
+    totals = session_day_totals().subquery()
+    columns = ["day", *DAILY_STATS_COUNTERS]
+    db.execute(insert(DailyStats).from_select(columns, select(*(totals.c[name] for name in columns))))
+    return db.scalar(select(func.count()).select_from(DailyStats))
+
+
+def get_summary(db: DbSession, start: date, end: date, granularity: Granularity) -> list:
+    """
+    One row per period with finalized sessions started on days in [start, end):
+    count, focus seconds, total pauses and a count per final status.
+
+    Reads the daily_stats rollup, so a multi-year range is a few hundred rows.
+    """
+    period = period_start(DailyStats.day, granularity, db.get_bind().dialect.name).label("period")
+    return db.execute(
+        select(period, *(func.sum(getattr(DailyStats, name)).label(name) for name in DAILY_STATS_COUNTERS))
+        .where(DailyStats.day >= start, DailyStats.day < end)
+        .group_by(period)
+        .order_by(period)
+    ).all()
+
+
+def minutes_between(start, end, dialect: str):
+    """SQL expression for the minutes from `start` to `end`."""
+    if dialect == "postgresql":
+        return func.extract("epoch", end - start) / 60
+    return (func.julianday(end) - func.julianday(start)) * 1440
+
+
+def get_reason_totals(db: DbSession, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list:
+    """
+    (reason, count, minutes_lost) per pause reason, for pauses in [start, end).
+
+    Grouped on the integer reason_id; labels are joined to the aggregate. An
+    unresumed pause counts until its session ended, or until now if still open.
+    """
+    ended = func.coalesce(
+        Interruption.resume_time,
+        select(Session.end_time).where(Session.id == Interruption.session_id).scalar_subquery(),
+        datetime.utcnow(),
+    )
+    lost = minutes_between(Interruption.pause_time, ended, db.get_bind().dialect.name)
+    per_reason = select(
+        Interruption.reason_id,
+        func.count().label("count"),
+        func.sum(lost).label("minutes_lost"),
+    ).group_by(Interruption.reason_id)
+    if start:
+        per_reason = per_reason.where(Interruption.pause_time >= start)
+    if end:
+        per_reason = per_reason.where(Interruption.pause_time < end)
+    per_reason = per_reason.subquery()
+    return db.execute(
+        select(PauseReason.label.label("reason"), per_reason.c.count, per_reason.c.minutes_lost)
+        .join(PauseReason, PauseReason.id == per_reason.c.reason_id)
+    ).all()
+
+
+def top_reasons(rows: list, limit: int) -> dict:
+    """The `limit` biggest reasons by count and by minutes lost, from one aggregate."""
+    def entry(row):
+        return {"reason": row.reason, "count": row.count, "minutes_lost": round(row.minutes_lost, 2)}
+
+    return {
+        "by_count": [entry(r) for r in heapq.nlargest(limit, rows, key=lambda r: (r.count, r.minutes_lost))],
+        "by_minutes": [entry(r) for r in heapq.nlargest(limit, rows, key=lambda r: (r.minutes_lost, r.count))],
+    }
+
+
+WEEK_HOURS = 7 * 24
+# the Unix epoch was a Thursday; three days on, hour-of-week 0 is Monday 00:00
+MONDAY_SHIFT = 3 * 86400
+HEATMAP_CHUNK = 100_000
+
+
+def _raw(column):
+    # no DateTime result processing: SQLite returns the stored ISO text, which
+    # NumPy parses far faster than SQLAlchemy builds datetime objects
+    return type_coerce(column, String)
+
+
+def epoch_seconds(values) -> np.ndarray:
+    """Stored timestamps (ISO text or datetimes) as float seconds since the Unix epoch, NaN for None."""
+    stamps = np.array(values, dtype="datetime64[us]")
+    seconds = stamps.astype(np.int64) / 1e6
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+
+def _hour_of_week(seconds: np.ndarray) -> np.ndarray:
+    return (seconds // 3600).astype(np.int64) % WEEK_HOURS
+
+
+def add_intervals(grid: np.ndarray, start: np.ndarray, end: np.ndarray, sign: float = 1.0) -> None:
+    """
+    Add the hours of each [start, end) interval (shifted epoch seconds) to its
+    hour-of-week bins, in constant work per interval however long it is.
+
+    An interval is a partial first hour, a partial last hour, and the whole
+    hours between: complete weeks add to every bin and the remainder is a
+    cyclic run of bins, summed with a difference array.
+    """
+    a, b = start / 3600, end / 3600
+    keep = b > a
+    a, b = a[keep], b[keep]
+    first, last = np.floor(a), np.floor(b)
+    same = first == last
+    first_bin = first.astype(np.int64) % WEEK_HOURS
+    grid += sign * np.bincount(first_bin, np.where(same, b - a, first + 1 - a), WEEK_HOURS)
+    grid += sign * np.bincount(last.astype(np.int64) % WEEK_HOURS, np.where(same, 0.0, b - last), WEEK_HOURS)
+
+    weeks, rest = np.divmod(np.maximum(last - first - 1, 0).astype(np.int64), WEEK_HOURS)
+    grid += sign * weeks.sum()
+    run_start = (first_bin + 1) % WEEK_HOURS
+    diff = np.bincount(run_start, minlength=2 * WEEK_HOURS) - np.bincount(run_start + rest, minlength=2 * WEEK_HOURS)
+    runs = np.cumsum(diff[:2 * WEEK_HOURS])
+    grid += sign * (runs[:WEEK_HOURS] + runs[WEEK_HOURS:])
+
+
+def _column_chunks(db: DbSession, statement):
+    """Per-column value lists of a streamed statement, HEATMAP_CHUNK rows at a time."""
+    result = db.connection().execution_options(yield_per=HEATMAP_CHUNK).execute(statement)
+    width = len(result.keys())
+    for rows in result.partitions():
+        # indexing each Row per column is several times faster than zip(*rows)
+        yield [[row[i] for row in rows] for i in range(width)]
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Hold off cyclic GC while a scan builds millions of short-lived rows; they
+    are freed by refcount, and every collection would walk them for nothing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def get_heatmap(db: DbSession, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                utc_offset_minutes: int = 0) -> dict:
+    """
+    Focused minutes and pause counts per weekday (Monday first) and hour, for
+    sessions started in [start, end), in local time at `utc_offset_minutes`.
+
+    Worked time is start to end (now while live) minus each pause from its
+    pause time to its resume, or to the session end for an unresumed one,
+    as calc_actual_duration counts it.
+
+    Cost is linear in the rows read: on SQLite about 150k sessions (with
+    their pauses) a second, so all of a 10M-session table takes about a
+    minute; `start`/`end` bound it.
+    """
+    sessions = (
+        select(Session.id, _raw(Session.start_time), _raw(Session.end_time))
+        .where(Session.start_time.is_not(None))
+        .order_by(Session.id)
+    )
+    if start:
+        sessions = sessions.where(Session.start_time >= start)
+    if end:
+        sessions = sessions.where(Session.start_time < end)
+
+    now = (datetime.utcnow() - datetime(1970, 1, 1)).total_seconds()
+    shift = MONDAY_SHIFT + utc_offset_minutes * 60
+    hours = np.zeros(WEEK_HOURS)
+    counts = np.zeros(WEEK_HOURS, dtype=np.int64)
+    with _gc_paused():
+        for ids, starts, ends in _column_chunks(db, sessions):
+            ids = np.array(ids)
+            starts, ends = epoch_seconds(starts) + shift, epoch_seconds(ends) + shift
+            ends[np.isnan(ends)] = now + shift
+            add_intervals(hours, starts, ends)
+
+            # the chunk's pauses by session_id range, without joining sessions;
+            # those of sessions outside [start, end) fail the id lookup
+            pauses = select(Interruption.session_id, _raw(Interruption.pause_time), _raw(Interruption.resume_time))
+            pauses = pauses.where(Interruption.session_id.between(int(ids[0]), int(ids[-1])))
+            for owners, paused, resumed in _column_chunks(db, pauses):
+                owners = np.array(owners)
+                at = np.searchsorted(ids, owners)
+                mine = ids[at] == owners
+                at = at[mine]
+                paused, resumed = epoch_seconds(paused)[mine] + shift, epoch_seconds(resumed)[mine] + shift
+                resumed = np.where(np.isnan(resumed), ends[at], resumed)
+                add_intervals(hours, paused, resumed, sign=-1.0)
+                counts += np.bincount(_hour_of_week(paused), minlength=WEEK_HOURS)
+    return {
+        "focus_minutes": np.round(np.maximum(hours, 0) * 60, 2).reshape(7, 24).tolist(),
+        "interruptions": counts.reshape(7, 24).tolist(),
+    }
+
+
+def summarize_period(sessions: int, focus_seconds: float, pauses: int, by_status: dict) -> dict:
+    return {
+        "sessions": sessions,
+        "focus_minutes": round(focus_seconds / 60, 2),
+        "by_status": by_status,
+        "avg_pauses": round(pauses / sessions, 2) if sessions else 0.0,
+        "overdue_ratio": round(by_status["overdue"] / sessions, 4) if sessions else 0.0,
+    }
+
+
+def main():
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollups.")
+    parser.add_argument("command", choices=["rebuild"], help="recompute daily_stats from sessions")
+    parser.parse_args()
+    with SessionLocal() as db:
+        days = rebuild_daily_stats(db)
+        db.commit()
+    print(f"daily_stats rebuilt: {days} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+pytest-benchmark suite for the per-session hot paths and /sessions/history.
+
+Not collected by the normal test run; point pytest at it explicitly. Save
+a baseline, then compare later runs against it:
+
+    cd backend
+    pytest benchmarks/bench_hot_paths.py --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+    pytest benchmarks/bench_hot_paths.py --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=median:15%
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+import crud
+from benchmarks import synthetic
+from database import create_db_engine, get_db
+from main import app
+from models import Session, Interruption, PauseReason
+from schemas import SessionResponse, SessionListItem
+
+START = datetime(2024, 1, 15, 9, 0)
+REASON = PauseReason(id=1, key="pause", label="Pause")
+
+
+def make_session(pauses: int, status: str = "completed") -> Session:
+    """A detached session with `pauses` loaded interruptions, the last one open if paused."""
+    interruptions = [
+        Interruption(
+            id=i, pause_reason=REASON,
+            pause_time=START + timedelta(seconds=20 * i),
+            resume_time=None if status == "paused" and i == pauses - 1 else START + timedelta(seconds=20 * i + 5),
+        )
+        for i in range(pauses)
+    ]
+    finished = status not in ("active", "paused")
+    return Session(
+        id=1, title="Bench", goal="Measure", scheduled_duration=45, start_time=START,
+        end_time=START + timedelta(minutes=50) if finished else None, status=status,
+        created_at=START, pause_count=pauses, total_paused_seconds=pauses * 5.0,
+        actual_duration_seconds=2820.0 if finished else None,
+        version=1, updated_at=START, interruptions=interruptions,
+    )
+
+
+# a live (paused) session takes the full path: elapsed time, paused total and
+# a scan of the loaded interruptions for the open one; a final one short-circuits
+@pytest.mark.parametrize("state", ["live", "final"])
+@pytest.mark.parametrize("pauses", [0, 10, 1000])
+def test_calc_actual_duration(benchmark, pauses, state):
+    status = "completed" if state == "final" else "paused" if pauses else "active"
+    benchmark(crud.calc_actual_duration, make_session(pauses, status))
+
+
+@pytest.mark.parametrize("args", [
+    pytest.param((0, False, 40.0, 45), id="completed"),
+    pytest.param((5, False, 40.0, 45), id="interrupted"),
+    pytest.param((1, True, 40.0, 45), id="abandoned"),
+    pytest.param((0, False, 60.0, 45), id="overdue"),
+])
+def test_calculate_final_status(benchmark, args):
+    benchmark(crud._calculate_final_status, *args)
+
+
+@pytest.mark.parametrize("pauses", [0, 10, 1000])
+def test_session_to_response(benchmark, pauses):
+    benchmark(crud.session_to_response, make_session(pauses))
+
+
+def test_session_to_list_item(benchmark):
+    benchmark(crud.session_to_list_item, make_session(3))
+
+
+@pytest.mark.parametrize("pauses", [0, 10, 1000])
+def test_encode_session_response(benchmark, pauses):
+    """SessionResponse validation + JSON dump, as the detail and transition routes do."""
+    benchmark(crud.encode_session_response, make_session(pauses))
+
+
+def test_validate_history_page(benchmark):
+    """FastAPI's response_model pass over a 50-item /sessions/history page."""
+    adapter = TypeAdapter(list[SessionListItem])
+    items = [crud.session_to_list_item(make_session(i % 5)) for i in range(50)]
+    benchmark(lambda: adapter.dump_json(adapter.validate_python(items)))
+
+
+def test_validate_session_response_model(benchmark):
+    data = crud.session_to_response(make_session(10))
+    benchmark(lambda: SessionResponse.model_validate(data).model_dump(mode="json"))
+
+
+@pytest.fixture(scope="module", params=[1_000, 10_000, 100_000], ids=lambda n: f"{n}rows")
+def history_client(request, tmp_path_factory):
+    engine = create_db_engine(f"sqlite:///{tmp_path_factory.mktemp('history') / 'bench.db'}")
+    synthetic.generate(engine, request.param)
+    Local = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+    def override_get_db():
+        with Local() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+@pytest.mark.parametrize("query", [
+    pytest.param({"limit": 50}, id="first-page"),
+    pytest.param({"limit": 500}, id="max-page"),
+    pytest.param({"limit": 50, "status": "overdue"}, id="status-filter"),
+])
+def test_history_request(benchmark, history_client, query):
+    def request():
+        resp = history_client.get("/sessions/history", params=query)
+        assert resp.status_code == 200
+
+    benchmark(request)
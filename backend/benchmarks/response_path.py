@@ -0,0 +1,100 @@
+"""
+Per-request CPU time of the session response path.
+
+Compares building a SessionResponse the way FastAPI does for a returned
+dict (validate, dump to python in JSON mode, json.dumps) with the
+TypeAdapter path in crud.encode_session_response, then measures the CPU
+time of full start/pause/resume/complete requests through the app.
+
+    cd backend
+    python -m benchmarks.response_path --iterations 5000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import crud
+from database import Base, get_db
+from main import app
+from models import Session, Interruption, PauseReason
+from schemas import SessionResponse
+
+
+REASON = PauseReason(id=1, key="pause", label="Pause")
+
+
+def sample_session(pauses: int = 3) -> Session:
+    start = datetime(2024, 1, 15, 9, 0)
+    return Session(
+        id=1, title="Bench", goal="Measure", scheduled_duration=45,
+        start_time=start, end_time=start + timedelta(minutes=50), status="completed",
+        created_at=start, pause_count=pauses, total_paused_seconds=pauses * 60.0,
+        actual_duration_seconds=2820.0,
+        interruptions=[
+            Interruption(id=i, pause_reason=REASON, pause_time=start + timedelta(minutes=10 * i),
+                         resume_time=start + timedelta(minutes=10 * i + 1))
+            for i in range(pauses)
+        ],
+    )
+
+
+def fastapi_style(session: Session) -> bytes:
+    model = SessionResponse.model_validate(crud.session_to_response(session))
+    return json.dumps(model.model_dump(mode="json")).encode()
+
+
+def cpu_per_call(fn, arg, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def cpu_per_request(iterations: int) -> float:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Local = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = Local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        requests = 0
+        started = time.process_time()
+        for _ in range(iterations):
+            sid = client.post("/sessions/", json={"title": "bench", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "bench"})
+            client.patch(f"/sessions/{sid}/resume")
+            client.patch(f"/sessions/{sid}/complete")
+            requests += 5
+        return (time.process_time() - started) / requests * 1e6
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    session = sample_session()
+    print(f"serialize  fastapi-style   {cpu_per_call(fastapi_style, session, args.iterations):8.1f} us")
+    print(f"serialize  type-adapter    {cpu_per_call(crud.encode_session_response, session, args.iterations):8.1f} us")
+    print(f"request    full lifecycle  {cpu_per_request(args.iterations // 10):8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
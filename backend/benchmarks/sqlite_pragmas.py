@@ -0,0 +1,90 @@
+"""
+Write throughput of the state-transition endpoints with and without the
+SQLite pragma profile from database.py.
+
+Each cycle is create -> start -> pause -> resume -> complete, i.e. five
+commits. Runs against a throwaway file database so fsync cost is real.
+
+    cd backend
+    python -m benchmarks.sqlite_pragmas --cycles 300 --threads 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, get_db, apply_sqlite_pragmas, SQLITE_PRAGMAS
+from main import app
+
+
+def run_cycle(client: TestClient) -> int:
+    """One full session lifecycle; returns the number of failed requests."""
+    failures = 0
+    resp = client.post("/sessions/", json={"title": "bench", "duration_minutes": 30})
+    if resp.status_code != 200:
+        return 1
+    sid = resp.json()["id"]
+    for method, path, body in (
+        ("patch", f"/sessions/{sid}/start", None),
+        ("patch", f"/sessions/{sid}/pause", {"reason": "bench"}),
+        ("patch", f"/sessions/{sid}/resume", None),
+        ("patch", f"/sessions/{sid}/complete", None),
+    ):
+        resp = client.request(method, path, json=body)
+        failures += resp.status_code != 200
+    return failures
+
+
+def bench(pragmas: dict, cycles: int, threads: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False},
+        )
+        apply_sqlite_pragmas(engine, pragmas)
+        Base.metadata.create_all(bind=engine)
+        Local = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        def override_get_db():
+            db = Local()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            client = TestClient(app)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                failures = sum(pool.map(lambda _: run_cycle(client), range(cycles)))
+            elapsed = time.perf_counter() - started
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            engine.dispose()
+
+    return {
+        "commits_per_sec": round(cycles * 5 / elapsed, 1),
+        "elapsed_sec": round(elapsed, 2),
+        "failed_requests": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    for label, pragmas in (("default", {}), ("tuned", SQLITE_PRAGMAS)):
+        result = bench(pragmas, args.cycles, args.threads)
+        print(f"{label:8} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+p50/p99 latency of the session endpoints with DB_MODE=sync vs DB_MODE=async.
+
+Starts uvicorn once per mode on a throwaway SQLite file and drives it with
+`--concurrency` httpx clients, each running create -> start -> detail ->
+history -> pause -> resume -> complete loops for `--duration` seconds.
+
+    cd backend
+    python -m benchmarks.sync_vs_async --concurrency 200 --duration 15
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from loadtest.server import local_server
+
+PORT = 8765
+
+
+async def client_loop(http: httpx.AsyncClient, deadline: float, latencies: list, errors: list):
+    async def call(method, path, json=None):
+        started = time.perf_counter()
+        try:
+            resp = await http.request(method, path, json=json)
+        except httpx.HTTPError:
+            errors.append(path)
+            return None
+        latencies.append(time.perf_counter() - started)
+        if resp.status_code >= 400:
+            errors.append(path)
+        return resp
+
+    while time.perf_counter() < deadline:
+        resp = await call("POST", "/sessions/", {"title": "load", "duration_minutes": 30})
+        if resp is None or resp.status_code != 200:
+            continue
+        sid = resp.json()["id"]
+        await call("PATCH", f"/sessions/{sid}/start")
+        await call("GET", f"/sessions/{sid}")
+        await call("GET", "/sessions/history?limit=20")
+        await call("PATCH", f"/sessions/{sid}/pause", {"reason": "load"})
+        await call("PATCH", f"/sessions/{sid}/resume")
+        await call("PATCH", f"/sessions/{sid}/complete")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client_loop(http, deadline, latencies, errors) for _ in range(concurrency)))
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+        "errors": len(errors),
+    }
+
+
+def run_mode(mode: str, concurrency: int, duration: float) -> dict:
+    pool = {"DB_POOL_SIZE": str(min(concurrency, 40)), "DB_MAX_OVERFLOW": "0"}
+    with local_server(PORT, DB_MODE=mode, **pool) as base_url:
+        return asyncio.run(drive(base_url, concurrency, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+
+    for mode in ("sync", "async"):
+        print(f"{mode:6} {run_mode(mode, args.concurrency, args.duration)}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Bulk-load N synthetic finalized sessions and their interruptions.
+
+Output is deterministic for a given --seed, --end and --batch-size (the
+--workers count does not matter): sessions are spread evenly over --years,
+every final status is represented, and pauses follow a skewed count
+distribution with exponential lengths. Worker processes generate batches
+while the main process inserts them with executemany, all in one
+transaction with SQLite fsyncs relaxed, so 10M sessions load in minutes.
+
+    cd backend
+    python -m benchmarks.synthetic --sessions 1000000 --database-url sqlite:///big.db
+"""
+import argparse
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as DbSession
+
+import analytics
+import crud
+from database import Base, create_db_engine
+from models import Session, normalize_reason
+
+TITLES = [
+    "API design review", "Write migration", "Refactor auth module", "Code review",
+    "Quarterly planning", "Fix flaky tests", "Write documentation", "Research caching",
+    "Prototype dashboard", "Database tuning", "Incident follow-up", "Read paper",
+    "Draft RFC", "Frontend polish", "Profile hot path", "Deep reading",
+]
+GOALS = [None, None, "Ship it", "Finish first draft", "Get to green", "Decide on approach"]
+DURATIONS = [15, 25, 30, 45, 45, 60, 60, 90, 120]
+
+PAUSE_REASONS = [
+    "Slack notification", "Phone call", "Meeting", "Coffee break", "Email notification",
+    "Colleague question", "Bathroom break", "Context switch", "Quick standup meeting", "Lunch",
+]
+# frequent reasons dominate, like real interruption logs
+REASON_WEIGHTS = list(accumulate([30, 10, 12, 10, 14, 8, 6, 4, 3, 3]))
+
+# target outcome -> weight; the stored status is always recomputed with
+# crud._calculate_final_status so it matches what complete_session would write
+OUTCOMES = {"completed": 55, "overdue": 15, "interrupted": 15, "abandoned": 15}
+OUTCOME_NAMES = list(OUTCOMES)
+OUTCOME_WEIGHTS = list(accumulate(OUTCOMES.values()))
+
+SESSION_COLUMNS = (
+    "id", "title", "goal", "scheduled_duration", "start_time", "end_time", "status", "created_at",
+    "pause_count", "total_paused_seconds", "actual_duration_seconds", "version", "updated_at",
+)
+INTERRUPTION_COLUMNS = ("session_id", "reason_id", "pause_time", "resume_time")
+
+RELAXED_SQLITE_PRAGMAS = {"synchronous": "OFF", "cache_size": -262144, "temp_store": "MEMORY"}
+
+
+def _insert_sql(table: str, columns: tuple[str, ...], paramstyle: str) -> str:
+    marker = "?" if paramstyle == "qmark" else "%s"
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([marker] * len(columns))})"
+
+
+def _pause_count(rng: random.Random, outcome: str) -> int:
+    if outcome == "interrupted":
+        return rng.randint(4, 9)
+    if outcome == "abandoned":
+        return rng.choices((1, 2, 3), cum_weights=(60, 90, 100))[0]
+    return rng.choices((0, 1, 2, 3), cum_weights=(50, 80, 95, 100))[0]
+
+
+def _work_factor(rng: random.Random, outcome: str) -> float:
+    """Worked time as a fraction of the scheduled duration."""
+    if outcome == "overdue":
+        return rng.uniform(1.12, 1.8)
+    if outcome == "abandoned":
+        return rng.uniform(0.1, 0.9)
+    if outcome == "interrupted":
+        return rng.uniform(0.5, 1.4)
+    return rng.uniform(0.6, 1.1)
+
+
+def generate_rows(rng: random.Random, session_id: int, version: int, created: datetime, to_db, reason_ids):
+    """One session row plus its interruption rows, as DB-ready tuples."""
+    outcome = rng.choices(OUTCOME_NAMES, cum_weights=OUTCOME_WEIGHTS)[0]
+    scheduled = rng.choice(DURATIONS)
+    pauses = _pause_count(rng, outcome)
+    worked = scheduled * 60 * _work_factor(rng, outcome)
+    abandoned = outcome == "abandoned"
+
+    # split worked time into the stretches between pauses; an abandoned
+    # session's last pause is never resumed, so it has one stretch fewer
+    stretches = pauses if abandoned else pauses + 1
+    cuts = sorted(rng.random() for _ in range(stretches - 1))
+    bounds = [0.0, *cuts, 1.0]
+    start = created + timedelta(seconds=rng.uniform(0, 600))
+    clock = start
+    paused = 0.0
+    interruptions = []
+    for i in range(stretches):
+        clock += timedelta(seconds=worked * (bounds[i + 1] - bounds[i]))
+        if i == pauses:
+            break
+        length = min(rng.expovariate(1 / 240), 3600)
+        if abandoned and i == pauses - 1:
+            # runs until the session is completed without a resume
+            resume = None
+        else:
+            resume = clock + timedelta(seconds=length)
+        interruptions.append((
+            session_id,
+            rng.choices(reason_ids, cum_weights=REASON_WEIGHTS)[0],
+            to_db(clock),
+            to_db(resume) if resume else None,
+        ))
+        clock += timedelta(seconds=length)
+        paused += length
+
+    end = clock
+    actual = max((end - start).total_seconds() - paused, 0)
+    status = crud._calculate_final_status(pauses, abandoned, actual / 60, scheduled)
+    session = (
+        session_id, rng.choice(TITLES), rng.choice(GOALS), scheduled, to_db(start), to_db(end),
+        status, to_db(created), pauses, paused, actual, version, to_db(end),
+    )
+    return session, interruptions
+
+
+def _sqlite_datetime(value: datetime) -> str:
+    # the exact text SQLAlchemy stores for DateTime on SQLite, so string
+    # comparisons (keyset cursors, ranges) order generated and API rows alike
+    return value.isoformat(" ", "microseconds")
+
+
+def _identity(value):
+    return value
+
+
+def generate_batch(seed: int, batch: int, first_n: int, count: int, first_id: int, first_version: int,
+                   first_created: datetime, step: timedelta, sqlite: bool, reason_ids: tuple):
+    """Rows for sessions first_n .. first_n + count - 1; depends only on (seed, batch)."""
+    rng = random.Random(seed * 1_000_003 + batch)
+    to_db = _sqlite_datetime if sqlite else _identity
+    step_seconds = step.total_seconds()
+    session_rows, interruption_rows = [], []
+    for n in range(first_n, first_n + count):
+        created = first_created + step * n + timedelta(seconds=rng.uniform(0, step_seconds))
+        row, pauses = generate_rows(rng, first_id + n, first_version + n, created, to_db, reason_ids)
+        session_rows.append(row)
+        interruption_rows.extend(pauses)
+    return session_rows, interruption_rows
+
+
+def _in_order(pool, jobs, window: int):
+    """Batches in job order, with at most `window` generated ahead of the writer."""
+    if pool is None:
+        yield from (generate_batch(*job) for job in jobs)
+        return
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(generate_batch, *job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def generate(engine, sessions: int, seed: int = 0, years: float = 3.0,
+             end: datetime = datetime(2026, 1, 1), batch_size: int = 20_000, workers: int = 1) -> dict:
+    """
+    Insert `sessions` finalized sessions in a single transaction; returns counts.
+
+    Batches are seeded independently, so `workers` processes can build them in
+    parallel while this one inserts, and the data is the same for any worker count.
+    """
+    Base.metadata.create_all(bind=engine)
+    dialect = engine.dialect
+    session_sql = _insert_sql("sessions", SESSION_COLUMNS, dialect.paramstyle)
+    interruption_sql = _insert_sql("interruptions", INTERRUPTION_COLUMNS, dialect.paramstyle)
+
+    span = timedelta(days=365 * years)
+    step = span / max(sessions, 1)
+    first_created = end - span
+
+    interruption_count = 0
+    with DbSession(bind=engine) as db:
+        conn = db.connection()
+        if dialect.name == "sqlite":
+            for name, value in RELAXED_SQLITE_PRAGMAS.items():
+                conn.exec_driver_sql(f"PRAGMA {name}={value}")
+        first_id = (db.scalar(select(func.max(Session.id))) or 0) + 1
+        # one change version per session, in id order, as bulk import does
+        first_version = crud.reserve_versions(db, sessions) if sessions else 0
+        keys = crud.get_pause_reason_ids(db, PAUSE_REASONS)
+        reason_ids = tuple(keys[normalize_reason(reason)] for reason in PAUSE_REASONS)
+
+        jobs = [
+            (seed, batch, offset, min(batch_size, sessions - offset), first_id, first_version,
+             first_created, step, dialect.name == "sqlite", reason_ids)
+            for batch, offset in enumerate(range(0, sessions, batch_size))
+        ]
+        with ProcessPoolExecutor(workers) if workers > 1 else nullcontext() as pool:
+            for session_rows, interruption_rows in _in_order(pool, jobs, window=2 * workers):
+                conn.exec_driver_sql(session_sql, session_rows)
+                if interruption_rows:
+                    conn.exec_driver_sql(interruption_sql, interruption_rows)
+                interruption_count += len(interruption_rows)
+        if dialect.name == "postgresql":
+            # ids were written explicitly, so move the SERIAL sequence past them
+            conn.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('sessions', 'id'), (SELECT max(id) FROM sessions))"
+            )
+        analytics.rebuild_daily_stats(db)
+        db.commit()
+    return {"sessions": sessions, "interruptions": interruption_count, "first_id": first_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=datetime(2026, 1, 1),
+                        help="creation time of the newest session (ISO date)")
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes generating rows while the main one inserts")
+    parser.add_argument("--database-url", default="sqlite:///./synthetic.db")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    started = time.perf_counter()
+    counts = generate(engine, args.sessions, args.seed, args.years, args.end, args.batch_size, args.workers)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    print(f"{counts['sessions']} sessions, {counts['interruptions']} interruptions "
+          f"in {elapsed:.1f}s ({counts['sessions'] / elapsed:,.0f} sessions/s)")
+
+
+if __name__ == "__main__":
+    main()
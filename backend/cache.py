@@ -0,0 +1,66 @@
+"""
+Byte-bounded LRU of encoded responses for finalized sessions.
+
+A session in a final status can no longer be changed by any endpoint, so
+its JSON body and headers are cached for the life of the process.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+FINAL_SESSION_CACHE_BYTES = int(os.getenv("FINAL_SESSION_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+class ByteLRUCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Optional[tuple[bytes, dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body: bytes, headers: dict):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(old[0])
+            self._entries[key] = (body, headers)
+            self.size_bytes += len(body)
+            while self.size_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+final_sessions = ByteLRUCache(FINAL_SESSION_CACHE_BYTES)
@@ -1,80 +1,530 @@
-from sqlalchemy.orm import Session as DbSession
+from sqlalchemy import and_, or_, bindparam, select, insert, update, func, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session as DbSession, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
 from typing import Optional
+import base64
 
-from models import Session, Interruption
-from schemas import SessionCreate
+from models import Session, Interruption, ChangeCounter, DailyStats, PauseReason, normalize_reason
+import events
+from schemas import SessionCreate, SessionImport, SessionResponse
+
+_session_response_adapter = TypeAdapter(SessionResponse)
+
+BULK_CHUNK_SIZE = 1000
+
+
+def _upsert(db: DbSession):
+    """The dialect's insert(), which has on_conflict_do_update / _do_nothing."""
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _bump_version(db: DbSession, count: int = 1) -> int:
+    """
+    Reserve `count` change versions and return the highest one.
+
+    The counter row stays locked until the caller's transaction ends, so
+    versions become visible in the order they were handed out, at the cost
+    of serializing concurrent writes on that row. The row is seeded with
+    the table; the upsert only covers a database where it went missing,
+    without two first writers racing to insert it.
+    """
+    now = datetime.utcnow()
+    stmt = _upsert(db)(ChangeCounter).values(id=1, value=count, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChangeCounter.id],
+        set_={"value": ChangeCounter.value + count, "updated_at": now},
+    )
+    return db.execute(stmt.returning(ChangeCounter.value)).scalar_one()
+
+
+def reserve_versions(db: DbSession, count: int) -> int:
+    """First of `count` consecutive change versions for rows written in one transaction."""
+    return _bump_version(db, count) - count + 1
+
+
+def get_pause_reason(db: DbSession, text: str) -> PauseReason:
+    """Dictionary entry for a reason, created on first use."""
+    key = normalize_reason(text)
+    # DO NOTHING leaves an existing row unwritten; RETURNING is then empty
+    stmt = _upsert(db)(PauseReason).values(key=key, label=" ".join(text.split()))
+    stmt = stmt.on_conflict_do_nothing(index_elements=[PauseReason.key])
+    reason = db.scalars(stmt.returning(PauseReason)).one_or_none()
+    return reason or db.scalars(select(PauseReason).where(PauseReason.key == key)).one()
+
+
+def get_pause_reason_ids(db: DbSession, texts) -> dict[str, int]:
+    """normalize_reason(text) -> id for every text, adding missing ones with one executemany."""
+    labels = {}
+    for text in texts:
+        labels.setdefault(normalize_reason(text), " ".join(text.split()))
+    if not labels:
+        return {}
+    db.execute(
+        _upsert(db)(PauseReason).on_conflict_do_nothing(index_elements=[PauseReason.key]),
+        [{"key": key, "label": label} for key, label in labels.items()],
+    )
+    return dict(db.execute(select(PauseReason.key, PauseReason.id).where(PauseReason.key.in_(labels))).all())
+
+
+DAILY_STATS_COUNTERS = ("sessions", "focus_seconds", "pauses", "completed", "interrupted", "abandoned", "overdue")
+
+
+def _add_daily_stats(db: DbSession, sessions: list[tuple[datetime, str, float, int]]) -> None:
+    """
+    Fold finalized (start_time, status, actual_seconds, pause_count) into
+    daily_stats with one INSERT ... ON CONFLICT DO UPDATE per day, inside the
+    caller's transaction.
+    """
+    days = {}
+    for start_time, status, actual_seconds, pause_count in sessions:
+        row = days.setdefault(start_time.date(), dict.fromkeys(DAILY_STATS_COUNTERS, 0))
+        row["sessions"] += 1
+        row["focus_seconds"] += actual_seconds or 0
+        row["pauses"] += pause_count
+        row[status] += 1
+    if not days:
+        return
+    stmt = _upsert(db)(DailyStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStats.day],
+        set_={name: getattr(DailyStats, name) + getattr(stmt.excluded, name) for name in DAILY_STATS_COUNTERS},
+    )
+    db.execute(stmt, [dict(row, day=day) for day, row in days.items()])
+
+
+def current_version(db: DbSession) -> int:
+    return db.scalar(select(ChangeCounter.value).where(ChangeCounter.id == 1)) or 0
+
+
+def get_history_state(db: DbSession) -> tuple[int, Optional[datetime], bool]:
+    """
+    Change version, time of the last write, and whether any session is active.
+
+    Active sessions report a running actual duration, so history containing
+    one is never byte-identical between polls.
+    """
+    has_active = select(Session.id).where(_is_live(), Session.status == "active").exists()
+    row = db.execute(
+        select(ChangeCounter.value, ChangeCounter.updated_at, has_active).where(ChangeCounter.id == 1)
+    ).one_or_none()
+    if row is None:
+        return 0, None, db.scalar(select(has_active))
+    return row[0], row[1], row[2]
+
+
+def get_session_state(db: DbSession, session_id: int):
+    """(version, status, updated_at) of a session without loading it, or None."""
+    return db.execute(
+        select(Session.version, Session.status, Session.updated_at).where(Session.id == session_id)
+    ).one_or_none()
 
 
 def create_session(db: DbSession, data: SessionCreate) -> Session:
     session = Session(
         title=data.title,
         goal=data.goal,
-        scheduled_duration=data.duration_minutes
+        scheduled_duration=data.duration_minutes,
+        interruptions=[],
+        version=_bump_version(db),
     )
     db.add(session)
     db.commit()
-    db.refresh(session)
+    events.publish_session("created", session)
     return session
 
 
+def _import_rows(data: SessionImport, now: datetime) -> tuple[dict, list[dict]]:
+    """Session row (with its denormalized columns) and interruption rows for one import."""
+    paused = 0.0
+    open_pause = None
+    for interruption in data.interruptions:
+        if interruption.resume_time is None:
+            open_pause = interruption.pause_time
+        else:
+            paused += (interruption.resume_time - interruption.pause_time).total_seconds()
+
+    actual_seconds = None
+    if data.end_time:
+        if open_pause is not None:
+            paused += (data.end_time - open_pause).total_seconds()
+        actual_seconds = max((data.end_time - data.start_time).total_seconds() - paused, 0)
+        status = _calculate_final_status(
+            len(data.interruptions), open_pause is not None, actual_seconds / 60, data.duration_minutes
+        )
+    elif open_pause is not None:
+        status = "paused"
+    elif data.start_time:
+        status = "active"
+    else:
+        status = "scheduled"
+
+    session_row = {
+        "title": data.title,
+        "goal": data.goal,
+        "scheduled_duration": data.duration_minutes,
+        "start_time": data.start_time,
+        "end_time": data.end_time,
+        "status": status,
+        "created_at": data.created_at or data.start_time or now,
+        "pause_count": len(data.interruptions),
+        "total_paused_seconds": paused,
+        "actual_duration_seconds": actual_seconds,
+        "updated_at": now,
+    }
+    interruption_rows = [i.model_dump() for i in data.interruptions]
+    return session_row, interruption_rows
+
+
+def _insert_chunk(db: DbSession, prepared: list[tuple[dict, list[dict]]]) -> list[int]:
+    """Insert _import_rows output and commit; returns the new session ids in order."""
+    # one version per row so /sessions/changes can page through them
+    first_version = reserve_versions(db, len(prepared))
+    for offset_in_chunk, (session_row, _) in enumerate(prepared):
+        session_row["version"] = first_version + offset_in_chunk
+    ids = db.scalars(
+        insert(Session).returning(Session.id, sort_by_parameter_order=True),
+        [session_row for session_row, _ in prepared],
+    ).all()
+    reason_ids = get_pause_reason_ids(db, (row["reason"] for _, rows in prepared for row in rows))
+    interruption_rows = [
+        {
+            "session_id": sid,
+            "reason_id": reason_ids[normalize_reason(row["reason"])],
+            "pause_time": row["pause_time"],
+            "resume_time": row["resume_time"],
+        }
+        for sid, (_, rows) in zip(ids, prepared)
+        for row in rows
+    ]
+    if interruption_rows:
+        db.execute(insert(Interruption), interruption_rows)
+    _add_daily_stats(db, [
+        (row["start_time"], row["status"], row["actual_duration_seconds"], row["pause_count"])
+        for row, _ in prepared
+        if row["status"] in FINAL_STATUSES
+    ])
+    db.commit()
+    return ids
+
+
+def bulk_create_sessions(
+    db: DbSession, records: list[tuple[int, SessionImport]], chunk_size: int = BULK_CHUNK_SIZE
+) -> tuple[list[int], list[tuple[int, str]]]:
+    """
+    Insert validated (index, record) pairs with executemany, one transaction per chunk.
+
+    A chunk that fails to commit is replayed a row at a time, so the rest of
+    it still lands. Returns the new session ids in input order and
+    (index, detail) for the rows that failed on their own.
+    """
+    now = datetime.utcnow()
+    session_ids, errors = [], []
+    for offset in range(0, len(records), chunk_size):
+        chunk = records[offset:offset + chunk_size]
+        try:
+            session_ids.extend(_insert_chunk(db, [_import_rows(data, now) for _, data in chunk]))
+            continue
+        except SQLAlchemyError:
+            db.rollback()
+        for index, data in chunk:
+            try:
+                session_ids.extend(_insert_chunk(db, [_import_rows(data, now)]))
+            except SQLAlchemyError as e:
+                db.rollback()
+                errors.append((index, f"Insert failed: {e.__class__.__name__}"))
+    return session_ids, errors
+
+
 def get_session(db: DbSession, session_id: int) -> Optional[Session]:
-    return db.query(Session).filter(Session.id == session_id).first()
+    return (
+        db.query(Session)
+        .options(selectinload(Session.interruptions))
+        .filter(Session.id == session_id)
+        .first()
+    )
+
+
+LIVE_STATUSES = ("scheduled", "active", "paused")
+FINAL_STATUSES = ("completed", "interrupted", "abandoned", "overdue")
 
 
-def get_all_sessions(db: DbSession) -> list[Session]:
-    return db.query(Session).order_by(Session.created_at.desc()).all()
+def _is_live():
+    # inlined rather than bound: SQLite only picks the partial index
+    # ix_sessions_live_status when the query repeats its WHERE literally
+    return Session.status.in_(bindparam("live_statuses", LIVE_STATUSES, expanding=True, literal_execute=True))
+
+
+def get_current_session(db: DbSession) -> Optional[Session]:
+    """Newest session that hasn't been completed yet, via ix_sessions_live_status."""
+    return (
+        db.query(Session)
+        .options(selectinload(Session.interruptions))
+        .filter(_is_live())
+        .order_by(Session.created_at.desc(), Session.id.desc())
+        .first()
+    )
 
 
-def start_session(db: DbSession, session: Session) -> Session:
-    if session.status != "scheduled":
-        raise ValueError(f"Cannot start session in '{session.status}' state")
-    
-    session.status = "active"
-    session.start_time = datetime.utcnow()
+def load_open_interruptions(db: DbSession, sessions: list[Session]) -> None:
+    """
+    Fill open_interruption for every paused session on a page with one
+    SELECT, instead of a lazy load per row in calc_actual_duration.
+    Finished sessions carry their duration, so pages without paused rows
+    cost nothing extra.
+    """
+    paused = {s.id: s for s in sessions if s.status == "paused"}
+    if not paused:
+        return
+    open_rows = db.scalars(
+        select(Interruption).where(Interruption.session_id.in_(paused), Interruption.resume_time.is_(None))
+    ).all()
+    by_session = {i.session_id: i for i in open_rows}
+    for session_id, session in paused.items():
+        set_committed_value(session, "open_interruption", by_session.get(session_id))
+
+
+CHANGES_PAGE_SIZE = 500
+
+
+def get_changes(db: DbSession, since: int, limit: int = CHANGES_PAGE_SIZE) -> tuple[list[Session], int, bool]:
+    """
+    Sessions whose version is above `since`, oldest change first.
+
+    Returns the sessions, the version to pass as `since` next time, and
+    whether more changes are waiting beyond this page.
+    """
+    # read the high-water mark first so nothing committed after it is skipped
+    high_water = current_version(db)
+    rows = (
+        db.query(Session)
+        .filter(Session.version > since, Session.version <= high_water)
+        .order_by(Session.version)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    load_open_interruptions(db, rows)
+    if has_more:
+        return rows, rows[-1].version, True
+    return rows, high_water, False
+
+
+def encode_cursor(session: Session) -> str:
+    """Opaque history cursor for a session's (created_at, id) position."""
+    raw = f"{session.created_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_sessions_page(
+    db: DbSession,
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    statuses: Optional[list[str]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> tuple[list[Session], bool]:
+    """
+    Keyset page of sessions ordered newest first on (created_at, id).
+
+    `before` walks towards older sessions, `after` towards newer ones.
+    Returns the page plus whether more rows exist in that direction.
+    """
+    if before and after:
+        raise ValueError("Use either 'before' or 'after', not both")
+
+    query = db.query(Session)
+    if statuses:
+        query = query.filter(Session.status.in_(statuses))
+    if created_from:
+        query = query.filter(Session.created_at >= created_from)
+    if created_to:
+        query = query.filter(Session.created_at < created_to)
+
+    if after:
+        ts, sid = decode_cursor(after)
+        query = query.filter(or_(
+            Session.created_at > ts,
+            and_(Session.created_at == ts, Session.id > sid)
+        )).order_by(Session.created_at.asc(), Session.id.asc())
+    else:
+        if before:
+            ts, sid = decode_cursor(before)
+            query = query.filter(or_(
+                Session.created_at < ts,
+                and_(Session.created_at == ts, Session.id < sid)
+            ))
+        query = query.order_by(Session.created_at.desc(), Session.id.desc())
+
+    # fetch one extra row to know if another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    load_open_interruptions(db, rows)
+    if after:
+        rows.reverse()
+    return rows, has_more
+
+
+class ConcurrentUpdate(ValueError):
+    """A transition kept losing to concurrent writes to the same session."""
+
+
+def _transition_failed(db: DbSession, session_id: int, action: str) -> None:
+    """Explain why a guarded UPDATE matched no row: missing session or wrong state."""
+    db.rollback()  # drop the version reserved for the failed write
+    status = db.scalar(select(Session.status).where(Session.id == session_id))
+    if status is None:
+        return None
+    raise ValueError(f"Cannot {action} session in '{status}' state")
+
+
+def _guarded_update(
+    db: DbSession, session_id: int, from_statuses: tuple, load_interruptions: bool = True, **values
+) -> Optional[Session]:
+    """UPDATE ... WHERE id = ? AND status IN (...) RETURNING, in a single statement."""
+    stmt = (
+        update(Session)
+        .where(Session.id == session_id, Session.status.in_(from_statuses))
+        .values(version=_bump_version(db), updated_at=datetime.utcnow(), **values)
+        .returning(Session)
+    )
+    if load_interruptions:
+        stmt = stmt.options(selectinload(Session.interruptions))
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def start_session(db: DbSession, session_id: int) -> Optional[Session]:
+    session = _guarded_update(
+        db, session_id, ("scheduled",), load_interruptions=False,
+        status="active", start_time=datetime.utcnow()
+    )
+    if session is None:
+        return _transition_failed(db, session_id, "start")
+    # a scheduled session has never been paused
+    set_committed_value(session, "interruptions", [])
     db.commit()
-    db.refresh(session)
+    events.publish_session("started", session)
     return session
 
 
-def pause_session(db: DbSession, session: Session, reason: str) -> Session:
-    if session.status != "active":
-        raise ValueError(f"Cannot pause session in '{session.status}' state")
-    
-    session.status = "paused"
-    interruption = Interruption(session_id=session.id, reason=reason)
-    db.add(interruption)
+def pause_session(db: DbSession, session_id: int, reason: str) -> Optional[Session]:
+    session = _guarded_update(
+        db, session_id, ("active",), status="paused", pause_count=Session.pause_count + 1
+    )
+    if session is None:
+        return _transition_failed(db, session_id, "pause")
+    session.interruptions.append(Interruption(pause_reason=get_pause_reason(db, reason)))
     db.commit()
-    db.refresh(session)
+    events.publish_session("paused", session)
     return session
 
 
-def resume_session(db: DbSession, session: Session) -> Session:
-    if session.status != "paused":
-        raise ValueError(f"Cannot resume session in '{session.status}' state")
-    
-    session.status = "active"
-    # mark the last interruption as resumed
-    last_int = session.last_interruption
-    if last_int:
-        last_int.resume_time = datetime.utcnow()
+def resume_session(db: DbSession, session_id: int) -> Optional[Session]:
+    # close the open interruption first; a session that isn't paused has none,
+    # so the guarded update below still decides whether the resume happens
+    now = datetime.utcnow()
+    closed = db.execute(
+        update(Interruption)
+        .where(Interruption.session_id == session_id, Interruption.resume_time.is_(None))
+        .values(resume_time=now)
+        .returning(Interruption.pause_time)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    paused = sum((now - pause_time).total_seconds() for pause_time in closed)
+
+    session = _guarded_update(
+        db, session_id, ("paused",),
+        status="active", total_paused_seconds=Session.total_paused_seconds + paused
+    )
+    if session is None:
+        return _transition_failed(db, session_id, "resume")
     db.commit()
-    db.refresh(session)
+    events.publish_session("resumed", session)
     return session
 
 
-def complete_session(db: DbSession, session: Session) -> Session:
-    if session.status not in ("active", "paused"):
-        raise ValueError(f"Cannot complete session in '{session.status}' state")
-    
-    session.end_time = datetime.utcnow()
-    session.status = _calculate_final_status(session)
+def complete_session(db: DbSession, session_id: int) -> Optional[Session]:
+    # the guarded write misses if a pause/resume lands after the read; the
+    # session is then usually still completable, so read it again once
+    for _ in range(2):
+        row = db.execute(
+            select(
+                Session.status, Session.start_time, Session.scheduled_duration,
+                Session.pause_count, Session.total_paused_seconds,
+            ).where(Session.id == session_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        if row.status not in ("active", "paused"):
+            raise ValueError(f"Cannot complete session in '{row.status}' state")
+
+        end_time = datetime.utcnow()
+        paused = row.total_paused_seconds
+        abandoned = False
+        # an unresumed pause runs until the end of the session
+        if row.status == "paused":
+            open_pause = db.scalar(
+                select(func.max(Interruption.pause_time))
+                .where(Interruption.session_id == session_id, Interruption.resume_time.is_(None))
+            )
+            if open_pause is not None:
+                paused += (end_time - open_pause).total_seconds()
+                abandoned = True
+        actual_seconds = max((end_time - row.start_time).total_seconds() - paused, 0)
+
+        # status and pause_count together catch any pause/resume since the read
+        stmt = (
+            update(Session)
+            .where(
+                Session.id == session_id,
+                Session.status == row.status,
+                Session.pause_count == row.pause_count,
+            )
+            .values(
+                status=_calculate_final_status(
+                    row.pause_count, abandoned, actual_seconds / 60, row.scheduled_duration
+                ),
+                end_time=end_time,
+                total_paused_seconds=paused,
+                actual_duration_seconds=actual_seconds,
+                version=_bump_version(db),
+                updated_at=end_time,
+            )
+            .returning(Session)
+            .options(selectinload(Session.interruptions))
+        )
+        session = db.execute(stmt).scalar_one_or_none()
+        if session is not None:
+            break
+        db.rollback()  # drop the version reserved for the missed write
+    else:
+        raise ConcurrentUpdate("Session changed while it was being completed; try again")
+
+    _add_daily_stats(db, [
+        (session.start_time, session.status, session.actual_duration_seconds, session.pause_count)
+    ])
     db.commit()
-    db.refresh(session)
+    events.publish_session("completed", session)
     return session
 
 
-def _calculate_final_status(session: Session) -> str:
+def _calculate_final_status(
+    pause_count: int, abandoned: bool, actual_minutes: float, scheduled_duration: int
+) -> str:
     """
     Status rules:
     - 4+ pauses -> interrupted
@@ -82,42 +532,49 @@ def _calculate_final_status(session: Session) -> str:
     - Actual time > scheduled + 10% -> overdue
     - Otherwise -> completed
     """
-    pause_count = session.pause_count
-    
     # check if abandoned (paused and never resumed)
-    if session.status == "paused":
-        last_int = session.last_interruption
-        if last_int and last_int.resume_time is None:
-            return "abandoned"
-    
+    if abandoned:
+        return "abandoned"
+
     # too many interruptions
     if pause_count >= 4:
         return "interrupted"
-    
+
     # check for overdue
-    if session.start_time and session.end_time:
-        actual_minutes = calc_actual_duration(session)
-        threshold = session.scheduled_duration * 1.1
-        if actual_minutes > threshold:
-            return "overdue"
-    
+    threshold = scheduled_duration * 1.1
+    if actual_minutes > threshold:
+        return "overdue"
+
     return "completed"
 
 
+def _open_pause_time(session: Session) -> Optional[datetime]:
+    # reuse the interruptions collection when it's already loaded (detail and
+    # mutation responses), otherwise fetch just the open row
+    if "interruptions" not in inspect(session).unloaded:
+        open_times = [i.pause_time for i in session.interruptions if i.resume_time is None]
+        return max(open_times, default=None)
+    open_int = session.open_interruption
+    return open_int.pause_time if open_int else None
+
+
 def calc_actual_duration(session: Session) -> float:
     """Calculate actual working time, excluding pause durations."""
     if not session.start_time:
         return 0.0
-    
+    if session.actual_duration_seconds is not None:
+        return session.actual_duration_seconds / 60
+
     end = session.end_time or datetime.utcnow()
     total_seconds = (end - session.start_time).total_seconds()
-    
-    # subtract pause durations
-    for interruption in session.interruptions:
-        resume = interruption.resume_time or end
-        pause_seconds = (resume - interruption.pause_time).total_seconds()
-        total_seconds -= pause_seconds
-    
+    total_seconds -= session.total_paused_seconds or 0
+
+    # the open pause isn't in total_paused_seconds until resume/complete
+    if session.status == "paused":
+        open_pause = _open_pause_time(session)
+        if open_pause is not None:
+            total_seconds -= (end - open_pause).total_seconds()
+
     return max(total_seconds / 60, 0)
 
 
@@ -146,6 +603,13 @@ def session_to_response(session: Session) -> dict:
     }
 
 
+def encode_session_response(session: Session) -> bytes:
+    """JSON body for a SessionResponse, validated and dumped by pydantic-core in one pass."""
+    return _session_response_adapter.dump_json(
+        _session_response_adapter.validate_python(session_to_response(session))
+    )
+
+
 def session_to_list_item(session: Session) -> dict:
     return {
         "id": session.id,
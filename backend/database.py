@@ -1,12 +1,259 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import os
+import threading
+import time
+from collections import deque
 
-DATABASE_URL = "sqlite:///./deepwork.db"
+from fastapi import Depends
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, declarative_base, Session as DbSession
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+import metrics
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./deepwork.db")
+
+# "sync" runs DB work on Starlette's thread pool, "async" on the event loop
+# through aiosqlite / asyncpg.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+# Pool sizing is per process; with several uvicorn workers the database sees
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections at most.
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "on"),
+}
+
+# Production pragma profile for SQLite. WAL lets readers run alongside the
+# single writer and, with synchronous=NORMAL, only fsyncs at checkpoints.
+# Set SQLITE_PRAGMAS=off to fall back to SQLite's defaults.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),  # negative = KiB
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+}
+if os.getenv("SQLITE_PRAGMAS", "on").lower() in ("off", "0", "false"):
+    SQLITE_PRAGMAS = {}
+
+# Opt-in: statements slower than SLOW_QUERY_MS are logged with their plan and
+# kept in a ring buffer of the last SLOW_QUERY_BUFFER entries (/debug/slow-queries).
+SLOW_QUERY_MS = float(os.environ["SLOW_QUERY_MS"]) if os.getenv("SLOW_QUERY_MS") else None
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", 100))
+
+slow_query_logger = logging.getLogger("deepwork.slow_query")
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict = SQLITE_PRAGMAS):
+    """Run the pragmas on every new DBAPI connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class PoolStats:
+    """Checkout counts and time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return conn
+
+
+def pool_status(engine) -> dict:
+    """Current pool occupancy plus cumulative checkout/wait counters."""
+    pool = engine.pool
+    status = {
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            idle=pool.checkedin(),
+        )
+    return status
+
+
+class SlowQueryLog:
+    """Bounded, thread-safe ring buffer of slow statements, newest last."""
+
+    def __init__(self, maxlen: int = SLOW_QUERY_BUFFER):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=maxlen)
+        self.recorded = 0
+
+    def record(self, entry: dict):
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+    def entries(self) -> list[dict]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.recorded = 0
+
+
+slow_queries = SlowQueryLog()
+
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def _explain(conn, statement, parameters) -> list[str]:
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None:
+        return []
+    # on Postgres a failed EXPLAIN would abort the request's transaction, so it
+    # runs in a savepoint; plain SQL, as begin_nested() from inside this
+    # cursor event would re-enter it
+    savepoint = conn.dialect.name == "postgresql"
+    # a fresh cursor: the statement's own cursor still holds unfetched rows
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [str(row[-1]) for row in cursor.fetchall()]
+        except Exception as e:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return [f"EXPLAIN failed: {e}"]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def record_slow_queries(engine, threshold_ms: float, log: SlowQueryLog = slow_queries):
+    """Record every statement on `engine` that runs longer than threshold_ms."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        if executemany:
+            # the plan is the same for every row; keep a sample of the parameters
+            plan = _explain(conn, statement, parameters[0]) if parameters else []
+            parameters = list(parameters[:5])
+        else:
+            plan = _explain(conn, statement, parameters)
+        entry = {
+            "at": time.time(),
+            "duration_ms": round(elapsed_ms, 3),
+            "route": metrics.current_route(),
+            "statement": statement,
+            "parameters": parameters,
+            "executemany": executemany,
+            "plan": plan,
+        }
+        log.record(entry)
+        slow_query_logger.warning(
+            "slow query %.1f ms [%s] %s params=%r plan=%s",
+            elapsed_ms, entry["route"], statement, parameters, " | ".join(plan),
+        )
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    url = make_url(url)
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if url.database not in (None, "", ":memory:"):
+        kwargs.update(POOL_SETTINGS, poolclass=InstrumentedQueuePool)
+    engine = create_engine(url, **kwargs)
+    apply_sqlite_pragmas(engine)
+    if SLOW_QUERY_MS is not None:
+        record_slow_queries(engine, SLOW_QUERY_MS)
+    return engine
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    # imported here so aiosqlite/asyncpg are only needed in async mode
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    url = make_url(url)
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    kwargs = {}
+    if url.database not in (None, "", ":memory:"):
+        kwargs.update(POOL_SETTINGS, poolclass=AsyncAdaptedQueuePool)
+    engine = create_async_engine(url, **kwargs)
+    apply_sqlite_pragmas(engine.sync_engine)
+    if SLOW_QUERY_MS is not None:
+        record_slow_queries(engine.sync_engine, SLOW_QUERY_MS)
+    return engine
+
+
+engine = create_db_engine()
+# objects stay loaded after commit, so responses are built from what the
+# transaction already fetched instead of a refresh SELECT
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_db_engine()
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +261,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session_factory():
+    """For work that outlives the request's own Session, like a streamed response body."""
+    return SessionLocal
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class SyncRunner:
+    """Runs a unit of work `fn(db, *args)` on a blocking Session in the thread pool."""
+
+    def __init__(self, db: DbSession):
+        self.db = db
+
+    async def run(self, fn, *args):
+        return await run_in_threadpool(fn, self.db, *args)
+
+
+class AsyncRunner:
+    """Runs the same unit of work on an AsyncSession; I/O never blocks the loop."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def run(self, fn, *args):
+        return await self.db.run_sync(fn, *args)
+
+
+if DB_MODE == "async":
+    def get_runner(db=Depends(get_async_db)):
+        return AsyncRunner(db)
+else:
+    def get_runner(db: DbSession = Depends(get_db)):
+        return SyncRunner(db)
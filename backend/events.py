@@ -0,0 +1,129 @@
+"""
+In-process broadcast of session state changes for GET /sessions/events.
+
+crud publishes an event after each committed transition. Events go out
+through a fan-out backend, which hands them to every worker's hub. The hub
+copies them into one bounded queue per SSE subscriber. A subscriber that
+falls behind has its backlog replaced by a single "resync" event telling
+it to catch up through /sessions/changes.
+"""
+import asyncio
+import json
+import threading
+from typing import Optional
+
+SUBSCRIBER_QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+
+
+class LocalFanout:
+    """Single-process stand-in: hands events straight back to this worker's hub.
+
+    A multi-worker deployment swaps in a backend with the same three methods
+    that publishes to a shared channel (Redis pub/sub, Postgres NOTIFY, ...)
+    and calls `deliver` for every message it receives.
+    """
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, event: dict):
+        if self._deliver:
+            self._deliver(event)
+
+    def stop(self):
+        self._deliver = None
+
+
+class EventHub:
+    def __init__(self, backend=None, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.backend = backend or LocalFanout()
+        self.backend.start(self.deliver)
+        self._subscribers: set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def set_backend(self, backend):
+        self.backend.stop()
+        self.backend = backend
+        backend.start(self.deliver)
+
+    def publish(self, event: dict):
+        """Called from request handlers, on any thread, after the commit."""
+        self.backend.publish(event)
+
+    def deliver(self, event: dict):
+        """Entry point for the backend; safe to call from any thread."""
+        with self._lock:
+            loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # coalesce the backlog into one "you missed events" marker
+                self.dropped += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "version": event.get("version")})
+
+    def subscribe(self) -> asyncio.Queue:
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+hub = EventHub()
+
+
+def publish_session(kind: str, session):
+    hub.publish({
+        "type": kind,
+        "id": session.id,
+        "status": session.status,
+        "pause_count": session.pause_count,
+        "version": session.version,
+    })
+
+
+def encode_sse(event: dict) -> bytes:
+    lines = []
+    if event.get("version") is not None:
+        # lets a reconnecting client resume with /sessions/changes?since=<Last-Event-ID>
+        lines.append(f"id: {event['version']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def sse_stream(is_disconnected, heartbeat: float = HEARTBEAT_SECONDS):
+    queue = hub.subscribe()
+    try:
+        yield b"retry: 3000\n\n"
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield encode_sse(event)
+    finally:
+        hub.unsubscribe(queue)
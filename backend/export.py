@@ -0,0 +1,87 @@
+"""
+Full-history export behind /sessions/export, one record per session.
+
+Sessions come from a single streamed cursor in id order, so memory holds one
+batch whatever the table size; each batch's interruptions are one indexed
+range query on session_id and are written inline with their session.
+"""
+import csv
+import io
+from datetime import datetime
+
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DbSession
+
+from models import Interruption, PauseReason, Session
+
+EXPORT_BATCH = 1000
+
+SESSION_COLUMNS = (
+    Session.id, Session.title, Session.goal, Session.scheduled_duration, Session.status,
+    Session.created_at, Session.start_time, Session.end_time, Session.pause_count,
+    Session.total_paused_seconds, Session.actual_duration_seconds, Session.version, Session.updated_at,
+)
+CSV_HEADER = [column.key for column in SESSION_COLUMNS] + ["interruptions"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def iter_batches(db: DbSession, batch_size: int = EXPORT_BATCH):
+    """Lists of session dicts in id order, each with its interruptions in pause order."""
+    sessions = db.connection().execution_options(yield_per=batch_size).execute(
+        select(*SESSION_COLUMNS).order_by(Session.id)
+    )
+    keys = list(sessions.keys())
+    for rows in sessions.partitions():
+        batch = [dict(zip(keys, row), interruptions=[]) for row in rows]
+        by_session = {session["id"]: session["interruptions"] for session in batch}
+        # ids are contiguous in the stream, so the batch's range holds only its sessions
+        pauses = db.connection().execute(
+            select(Interruption.session_id, Interruption.id, PauseReason.label,
+                   Interruption.pause_time, Interruption.resume_time)
+            .join(PauseReason, PauseReason.id == Interruption.reason_id)
+            .where(Interruption.session_id.between(batch[0]["id"], batch[-1]["id"]))
+            .order_by(Interruption.session_id, Interruption.id)
+        )
+        for session_id, pause_id, reason, pause_time, resume_time in pauses:
+            by_session[session_id].append(
+                {"id": pause_id, "reason": reason, "pause_time": pause_time, "resume_time": resume_time}
+            )
+        yield batch
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_ndjson(batch: list[dict]) -> bytes:
+    # pydantic-core's serializer writes datetimes as ISO 8601, like the API responses
+    return b"".join([to_json(session) + b"\n" for session in batch])
+
+
+def encode_csv(batch: list[dict]) -> bytes:
+    """
+    Rows in CSV_HEADER order; the interruptions column is a JSON array.
+
+    Line breaks in a title or goal stay inside the quoted field (RFC 4180),
+    so such a record spans several lines; csv readers parse it back as one.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for session in batch:
+        writer.writerow([
+            *(_iso(session[name]) for name in CSV_HEADER[:-1]),
+            to_json(session["interruptions"]).decode(),
+        ])
+    return out.getvalue().encode()
+
+
+def stream(session_factory, fmt: str):
+    """Response body chunks: the CSV header, if any, then one chunk per batch."""
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    if fmt == "csv":
+        yield (",".join(CSV_HEADER) + "\n").encode()
+    with session_factory() as db:
+        for batch in iter_batches(db):
+            yield encode(batch)
@@ -0,0 +1,7 @@
+"""
+Reproducible HTTP load test for the session API.
+
+    cd backend
+    python -m loadtest --concurrency 50 --duration 30 --out before.json
+    python -m loadtest --concurrency 50 --duration 30 --out after.json --compare before.json
+"""
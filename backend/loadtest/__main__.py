@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import loadtest
+from loadtest.report import compare, dump, summarize
+from loadtest.server import local_server
+from loadtest.workload import DEFAULT_MIX, parse_mix, run_workload
+
+PORT = 8766
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=loadtest.__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=loadtest.__doc__,
+    )
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+        help="operation weights, e.g. create=1,start=1,pause=1,resume=1,complete=1,detail=4,history=2",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history-limit", type=int, default=50)
+    parser.add_argument("--db-mode", choices=["sync", "async"], help="DB_MODE for the started server")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="baseline report to print deltas against")
+    args = parser.parse_args()
+
+    config = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "seed": args.seed,
+        "history_limit": args.history_limit,
+        "target": args.url or "local",
+        "db_mode": args.db_mode or os.getenv("DB_MODE", "sync"),
+        "commit": git_commit(),
+    }
+
+    def run(base_url):
+        return asyncio.run(run_workload(
+            base_url, args.mix, args.concurrency, args.duration, args.seed, args.history_limit
+        ))
+
+    if args.url:
+        recorder, elapsed = run(args.url)
+    else:
+        with local_server(PORT, DB_MODE=config["db_mode"]) as base_url:
+            recorder, elapsed = run(base_url)
+
+    report = summarize(recorder, elapsed, config)
+    if args.out:
+        dump(report, args.out)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
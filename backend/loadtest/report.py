@@ -0,0 +1,88 @@
+"""Latency recording and the JSON report written by `python -m loadtest`."""
+import json
+import statistics
+from collections import defaultdict
+
+
+class Recorder:
+    """Per-endpoint latencies (seconds), status codes and transport errors."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+
+    def record_error(self, endpoint: str):
+        self.errors[endpoint] += 1
+
+
+def _percentiles(values: list[float]) -> dict:
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "p99_ms": round(p99 * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def summarize(recorder: Recorder, elapsed: float, config: dict) -> dict:
+    endpoints = {}
+    for endpoint in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = recorder.latencies.get(endpoint, [])
+        statuses = recorder.statuses.get(endpoint, {})
+        summary = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "errors": recorder.errors.get(endpoint, 0),
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        }
+        if values:
+            summary.update(_percentiles(values))
+        endpoints[endpoint] = summary
+
+    everything = [v for values in recorder.latencies.values() for v in values]
+    total = {
+        "requests": len(everything),
+        "rps": round(len(everything) / elapsed, 2),
+        "errors": sum(recorder.errors.values()),
+    }
+    if everything:
+        total.update(_percentiles(everything))
+    return {"config": config, "elapsed_s": round(elapsed, 2), "total": total, "endpoints": endpoints}
+
+
+def dump(report: dict, path: str):
+    # sorted keys and one value per line so `git diff` / `diff` line up
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Text table of throughput and latency changes per endpoint."""
+    lines = [f"{'endpoint':34} {'rps':>24} {'p50_ms':>24} {'p95_ms':>24} {'p99_ms':>24}"]
+    rows = [("total", baseline["total"], current["total"])]
+    rows += [
+        (name, baseline["endpoints"][name], current["endpoints"][name])
+        for name in sorted(current["endpoints"])
+        if name in baseline["endpoints"]
+    ]
+    for name, before, after in rows:
+        cells = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(key), after.get(key)
+            if not old or new is None:
+                cells.append(f"{'-':>24}")
+                continue
+            cells.append(f"{old} -> {new} ({(new - old) / old:+.0%})".rjust(24))
+        lines.append(f"{name:34} " + " ".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,41 @@
+"""A uvicorn subprocess for load runs, shared with benchmarks.sync_vs_async."""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+
+
+def wait_for_server(base_url: str, timeout: float = 15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{base_url}/debug/pool", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+@contextmanager
+def local_server(port: int, **env_overrides: str):
+    """uvicorn on a throwaway SQLite file, so runs start from the same empty state."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'load.db')}", **env_overrides)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_for_server(base_url)
+            yield base_url
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
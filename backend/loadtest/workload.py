@@ -0,0 +1,164 @@
+"""
+The mixed session workload: virtual users pick weighted operations and walk
+sessions through create -> start -> pause/resume -> complete.
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+from loadtest.report import Recorder
+
+DEFAULT_MIX = {
+    "create": 1,
+    "start": 1,
+    "pause": 1,
+    "resume": 1,
+    "complete": 1,
+    "detail": 4,
+    "history": 2,
+}
+
+PAUSE_REASONS = [
+    "Slack notification",
+    "Phone call",
+    "Meeting",
+    "Coffee",
+    "Email",
+    "Colleague question",
+    "Bathroom break",
+    "Context switch",
+]
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """`create=1,detail=4,...` -> weights; unknown operations are an error."""
+    mix = dict.fromkeys(DEFAULT_MIX, 0.0)
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in mix:
+            raise ValueError(f"Unknown operation '{name}' (expected one of {', '.join(mix)})")
+        mix[name] = float(weight)
+    if not any(mix.values()):
+        raise ValueError("At least one operation needs a positive weight")
+    return mix
+
+
+class SessionPools:
+    """
+    Ids of the sessions this run created, by the state the API last reported.
+
+    An id is taken out of its pool while a transition is in flight, so two
+    users never race the same session into a 400.
+    """
+
+    def __init__(self):
+        self.by_state = {"scheduled": [], "active": [], "paused": []}
+        self.finished = []
+
+    def take(self, rng: random.Random, *states: str):
+        candidates = [s for s in states if self.by_state[s]]
+        if not candidates:
+            return None, None
+        state = rng.choice(candidates)
+        pool = self.by_state[state]
+        index = rng.randrange(len(pool))
+        pool[index], pool[-1] = pool[-1], pool[index]
+        return pool.pop(), state
+
+    def put(self, session_id: int, state: str):
+        if state in self.by_state:
+            self.by_state[state].append(session_id)
+        else:
+            self.finished.append(session_id)
+
+    def any_id(self, rng: random.Random):
+        known = self.finished + [sid for pool in self.by_state.values() for sid in pool]
+        return rng.choice(known) if known else None
+
+
+# operation -> (endpoint label, states it can start from, path action)
+TRANSITIONS = {
+    "start": ("PATCH /sessions/{id}/start", ("scheduled",), "start"),
+    "pause": ("PATCH /sessions/{id}/pause", ("active",), "pause"),
+    "resume": ("PATCH /sessions/{id}/resume", ("paused",), "resume"),
+    "complete": ("PATCH /sessions/{id}/complete", ("active", "paused"), "complete"),
+}
+
+
+class VirtualUser:
+    def __init__(self, http: httpx.AsyncClient, pools: SessionPools, recorder: Recorder,
+                 mix: dict[str, float], rng: random.Random, history_limit: int):
+        self.http = http
+        self.pools = pools
+        self.recorder = recorder
+        self.operations = [op for op, weight in mix.items() if weight > 0]
+        self.weights = [mix[op] for op in self.operations]
+        self.rng = rng
+        self.history_limit = history_limit
+
+    async def call(self, endpoint: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = await self.http.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record_error(endpoint)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - started, resp.status_code)
+        return resp
+
+    async def run(self, deadline: float):
+        while time.perf_counter() < deadline:
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            await getattr(self, f"do_{operation}", self.do_transition)(operation)
+
+    async def do_create(self, _):
+        body = {
+            "title": f"Load {self.rng.randrange(1_000_000)}",
+            "goal": self.rng.choice([None, "Ship it"]),
+            "duration_minutes": self.rng.choice([15, 25, 45, 60, 90]),
+        }
+        resp = await self.call("POST /sessions/", "POST", "/sessions/", json=body)
+        if resp is not None and resp.status_code == 200:
+            self.pools.put(resp.json()["id"], "scheduled")
+
+    async def do_transition(self, operation: str):
+        endpoint, from_states, action = TRANSITIONS[operation]
+        session_id, state = self.pools.take(self.rng, *from_states)
+        if session_id is None:
+            # nothing in the right state yet: grow the population instead
+            return await self.do_create(operation)
+        kwargs = {"json": {"reason": self.rng.choice(PAUSE_REASONS)}} if operation == "pause" else {}
+        resp = await self.call(endpoint, "PATCH", f"/sessions/{session_id}/{action}", **kwargs)
+        if resp is None or resp.status_code != 200:
+            # state unknown after a failure; drop the id rather than guess
+            return
+        self.pools.put(session_id, resp.json()["status"])
+
+    async def do_detail(self, operation: str):
+        session_id = self.pools.any_id(self.rng)
+        if session_id is None:
+            return await self.do_create(operation)
+        await self.call("GET /sessions/{id}", "GET", f"/sessions/{session_id}")
+
+    async def do_history(self, _):
+        await self.call("GET /sessions/history", "GET", "/sessions/history",
+                        params={"limit": self.history_limit})
+
+
+async def run_workload(base_url: str, mix: dict[str, float], concurrency: int, duration: float,
+                       seed: int = 0, history_limit: int = 50) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    pools = SessionPools()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        users = [
+            VirtualUser(http, pools, recorder, mix, random.Random(seed * 100_003 + i), history_limit)
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(user.run(deadline) for user in users))
+        elapsed = time.perf_counter() - started
+    return recorder, elapsed
@@ -1,18 +1,58 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+
+from fastapi import FastAPI, Body, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session as DbSession
 
-from database import engine, get_db, Base
-from schemas import SessionCreate, PauseRequest, SessionResponse, SessionListItem
+from database import (
+    engine, async_engine, Base, pool_status, get_runner, get_session_factory, SyncRunner, AsyncRunner,
+    SLOW_QUERY_MS, slow_queries,
+)
+from schemas import (
+    SessionCreate, SessionImport, PauseRequest, SessionResponse, SessionListItem, SessionStatus,
+    BulkImportResult, SessionChanges, Granularity, AnalyticsSummary,
+    InterruptionAnalytics, Heatmap, ExportFormat, to_naive_utc,
+)
+import analytics
+import cache
 import crud
+import events
+import export
+import metrics
+
+BULK_MAX_RECORDS = 10_000
+
+_session_import_adapter = TypeAdapter(SessionImport)
+
+DbRunner = SyncRunner | AsyncRunner
 
 # create tables if they don't exist (for development)
 Base.metadata.create_all(bind=engine)
 
+metrics.instrument_engine(engine)
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    events.hub.backend.stop()
+    # aiosqlite connections own worker threads; close them so shutdown completes
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 app = FastAPI(
     title="Deep Work Session Tracker",
     version="1.0.0",
-    description="Track and manage deep work sessions with interruption logging"
+    description="Track and manage deep work sessions with interruption logging",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -21,72 +61,374 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Change-Version", "ETag", "Last-Modified"],
 )
+# added last so it is outermost and times the whole request
+app.add_middleware(metrics.MetricsMiddleware)
 
 
-@app.post("/sessions/", response_model=SessionResponse)
-def create_session(data: SessionCreate, db: DbSession = Depends(get_db)):
-    session = crud.create_session(db, data)
-    return crud.session_to_response(session)
+def _history_page(db: DbSession, if_none_match, limit, before, after, statuses, created_from, created_to):
+    # read before the page so a client that syncs from here misses nothing
+    version, updated_at, has_active = crud.get_history_state(db)
+    headers = {"X-Change-Version": str(version)}
+    if updated_at:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+    # while any session is active the version alone no longer pins the body
+    if not has_active:
+        headers["ETag"] = f'"h{version}"'
+        headers["Cache-Control"] = "no-cache"
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return None, headers
 
+    try:
+        sessions, has_more = crud.get_sessions_page(
+            db, limit, before=before, after=after, statuses=statuses,
+            created_from=created_from, created_to=created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@app.get("/sessions/history", response_model=list[SessionListItem])
-def get_history(db: DbSession = Depends(get_db)):
-    sessions = crud.get_all_sessions(db)
-    return [crud.session_to_list_item(s) for s in sessions]
+    # cursors go in headers so the body stays a plain list
+    if sessions:
+        if has_more or after:
+            headers["X-Next-Cursor"] = crud.encode_cursor(sessions[-1])
+        if before or (after and has_more):
+            headers["X-Prev-Cursor"] = crud.encode_cursor(sessions[0])
+    with metrics.serializing():
+        return [crud.session_to_list_item(s) for s in sessions], headers
 
 
-@app.get("/sessions/{session_id}", response_model=SessionResponse)
-def get_session(session_id: int, db: DbSession = Depends(get_db)):
-    session = crud.get_session(db, session_id)
-    if not session:
+def _changes(db: DbSession, since: int, limit: int) -> dict:
+    sessions, version, has_more = crud.get_changes(db, since, limit)
+    with metrics.serializing():
+        items = [crud.session_to_list_item(s) for s in sessions]
+    return {"version": version, "has_more": has_more, "sessions": items}
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _session_headers(session_id: int, version: int, status: str, updated_at) -> dict:
+    headers = {}
+    if updated_at:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+    # a running session's actual duration changes every second, so no ETag then
+    if status != "active":
+        headers["ETag"] = f'"s{session_id}v{version}"'
+        headers["Cache-Control"] = IMMUTABLE if status in crud.FINAL_STATUSES else "no-cache"
+    return headers
+
+
+def _encode_detail(session) -> tuple[bytes, dict]:
+    with metrics.serializing():
+        body = crud.encode_session_response(session)
+    headers = _session_headers(session.id, session.version, session.status, session.updated_at)
+    if session.status in crud.FINAL_STATUSES:
+        cache.final_sessions.put(session.id, body, headers)
+    return body, headers
+
+
+def _session_detail(db: DbSession, session_id: int, if_none_match: Optional[str]):
+    state = crud.get_session_state(db, session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
-    return crud.session_to_response(session)
 
+    headers = _session_headers(session_id, state.version, state.status, state.updated_at)
+    if "ETag" in headers and _etag_matches(if_none_match, headers["ETag"]):
+        return None, headers
+    return _encode_detail(crud.get_session(db, session_id))
 
-@app.patch("/sessions/{session_id}/start", response_model=SessionResponse)
-def start_session(session_id: int, db: DbSession = Depends(get_db)):
-    session = crud.get_session(db, session_id)
+
+def _current_session(db: DbSession) -> bytes:
+    session = crud.get_current_session(db)
     if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+        return b"null"
+    with metrics.serializing():
+        return crud.encode_session_response(session)
+
+
+def _transition(db: DbSession, session_id: int, action, *args) -> bytes:
     try:
-        session = crud.start_session(db, session)
+        session = action(db, session_id, *args)
+    except crud.ConcurrentUpdate as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return crud.session_to_response(session)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return _encode_detail(session)[0]
+
+
+def _create(db: DbSession, data: SessionCreate) -> bytes:
+    session = crud.create_session(db, data)
+    with metrics.serializing():
+        return crud.encode_session_response(session)
+
+
+def _bulk_import(db: DbSession, records: list[dict[str, Any]]) -> dict:
+    valid, errors = [], []
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, _session_import_adapter.validate_python(record)))
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+                for err in e.errors()
+            )
+            errors.append((index, detail))
+
+    session_ids, insert_errors = crud.bulk_create_sessions(db, valid)
+    errors.extend(insert_errors)
+    return {
+        "created": len(session_ids),
+        "session_ids": session_ids,
+        "errors": [{"index": i, "detail": d} for i, d in sorted(errors)],
+    }
+
+
+def _analytics_summary(db: DbSession, start: date, end: date, granularity: str) -> dict:
+    rows = analytics.get_summary(db, start, end, granularity)
+    periods = []
+    totals = dict.fromkeys(("sessions", "focus_seconds", "pauses", *crud.FINAL_STATUSES), 0)
+    for row in rows:
+        by_status = {status: getattr(row, status) for status in crud.FINAL_STATUSES}
+        periods.append({
+            "period": row.period,
+            **analytics.summarize_period(row.sessions, row.focus_seconds, row.pauses, by_status),
+        })
+        for key in totals:
+            totals[key] += getattr(row, key)
+    by_status = {status: totals[status] for status in crud.FINAL_STATUSES}
+    return {
+        "start": datetime.combine(start, time.min),
+        "end": datetime.combine(end, time.min),
+        "granularity": granularity,
+        "totals": analytics.summarize_period(
+            totals["sessions"], totals["focus_seconds"], totals["pauses"], by_status
+        ),
+        "periods": periods,
+    }
+
+
+def utc_range(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Optional `from`/`to` as naive UTC, like the stored timestamps; 400 unless from < to."""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return start, end
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as RFC 9110 specifies for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    return etag in tags
+
+
+def _json(body: bytes) -> Response:
+    # already validated against SessionResponse; skip FastAPI's second pass
+    return Response(content=body, media_type="application/json")
+
+
+@app.post("/sessions/", response_model=SessionResponse)
+async def create_session(data: SessionCreate, db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_create, data))
+
+
+@app.post("/sessions/bulk", response_model=BulkImportResult)
+async def bulk_create_sessions(
+    records: list[dict[str, Any]] = Body(...),
+    db: DbRunner = Depends(get_runner),
+):
+    if len(records) > BULK_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RECORDS} records per request")
+    return await db.run(_bulk_import, records)
+
+
+@app.get("/sessions/history", response_model=list[SessionListItem])
+async def get_history(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    status: Optional[list[SessionStatus]] = Query(None),
+    created: tuple[Optional[datetime], Optional[datetime]] = Depends(utc_range),
+    if_none_match: Optional[str] = Header(None),
+    db: DbRunner = Depends(get_runner),
+):
+    items, headers = await db.run(_history_page, if_none_match, limit, before, after, status, *created)
+    if items is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return items
+
+
+@app.get("/sessions/events")
+async def session_events(request: Request):
+    """Server-Sent Events stream of session state changes."""
+    return StreamingResponse(
+        events.sse_stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/sessions/export")
+async def export_sessions(format: ExportFormat = "ndjson", session_factory=Depends(get_session_factory)):
+    """
+    Every session with its interruptions inline, one per line, streamed from a
+    server-side cursor. The body opens its own Session: the request's is
+    closed before streaming starts.
+    """
+    return StreamingResponse(
+        export.stream(session_factory, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="sessions.{format}"'},
+    )
+
+
+@app.get("/sessions/changes", response_model=SessionChanges)
+async def get_changes(
+    since: int = Query(..., ge=0),
+    limit: int = Query(crud.CHANGES_PAGE_SIZE, ge=1, le=crud.CHANGES_PAGE_SIZE),
+    db: DbRunner = Depends(get_runner),
+):
+    return await db.run(_changes, since, limit)
+
+
+@app.get("/sessions/current", response_model=Optional[SessionResponse])
+async def get_current_session(db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_current_session))
+
+
+@app.get("/sessions/{session_id}", response_model=SessionResponse)
+async def get_session(
+    session_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: DbRunner = Depends(get_runner),
+):
+    # finalized sessions never change: answer from memory without touching the DB
+    cached = cache.final_sessions.get(session_id)
+    if cached:
+        body, headers = cached
+        if _etag_matches(if_none_match, headers["ETag"]):
+            body = None
+    else:
+        body, headers = await db.run(_session_detail, session_id, if_none_match)
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.patch("/sessions/{session_id}/start", response_model=SessionResponse)
+async def start_session(session_id: int, db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_transition, session_id, crud.start_session))
 
 
 @app.patch("/sessions/{session_id}/pause", response_model=SessionResponse)
-def pause_session(session_id: int, data: PauseRequest, db: DbSession = Depends(get_db)):
-    session = crud.get_session(db, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    try:
-        session = crud.pause_session(db, session, data.reason)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return crud.session_to_response(session)
+async def pause_session(session_id: int, data: PauseRequest, db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_transition, session_id, crud.pause_session, data.reason))
 
 
 @app.patch("/sessions/{session_id}/resume", response_model=SessionResponse)
-def resume_session(session_id: int, db: DbSession = Depends(get_db)):
-    session = crud.get_session(db, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    try:
-        session = crud.resume_session(db, session)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return crud.session_to_response(session)
+async def resume_session(session_id: int, db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_transition, session_id, crud.resume_session))
 
 
 @app.patch("/sessions/{session_id}/complete", response_model=SessionResponse)
-def complete_session(session_id: int, db: DbSession = Depends(get_db)):
-    session = crud.get_session(db, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    try:
-        session = crud.complete_session(db, session)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return crud.session_to_response(session)
+async def complete_session(session_id: int, db: DbRunner = Depends(get_runner)):
+    return _json(await db.run(_transition, session_id, crud.complete_session))
+
+
+@app.get("/analytics/summary", response_model=AnalyticsSummary)
+async def analytics_summary(
+    period: tuple[Optional[datetime], Optional[datetime]] = Depends(utc_range),
+    granularity: Granularity = "day",
+    db: DbRunner = Depends(get_runner),
+):
+    """
+    Focus time, outcomes and pauses of finalized sessions, per period of start
+    day (UTC). The range is widened to whole days: a partial `to` day is included.
+    """
+    start, end = period
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    start_day = start.date()
+    end_day = end.date() if end.time() == time.min else end.date() + timedelta(days=1)
+    if start_day >= end_day:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return await db.run(_analytics_summary, start_day, end_day, granularity)
+
+
+@app.get("/analytics/interruptions", response_model=InterruptionAnalytics)
+async def analytics_interruptions(
+    limit: int = Query(10, ge=1, le=100),
+    period: tuple[Optional[datetime], Optional[datetime]] = Depends(utc_range),
+    db: DbRunner = Depends(get_runner),
+):
+    """Top pause reasons by number of pauses and by minutes lost, optionally for pauses in [from, to)."""
+    rows = await db.run(analytics.get_reason_totals, *period)
+    return analytics.top_reasons(rows, limit)
+
+
+@app.get("/analytics/heatmap", response_model=Heatmap)
+async def analytics_heatmap(
+    period: tuple[Optional[datetime], Optional[datetime]] = Depends(utc_range),
+    utc_offset_minutes: int = Query(0, ge=-720, le=840),
+    db: DbRunner = Depends(get_runner),
+):
+    """Focused minutes and pauses per weekday and hour for sessions started in [from, to), all history by default."""
+    grids = await db.run(analytics.get_heatmap, *period, utc_offset_minutes)
+    start, end = period
+    return {"start": start, "end": end, "utc_offset_minutes": utc_offset_minutes, **grids}
+
+
+@app.get("/debug/pool")
+def get_pool_status():
+    return pool_status(engine)
+
+
+@app.get("/debug/cache")
+def get_cache_status():
+    return cache.final_sessions.stats()
+
+
+@app.get("/debug/slow-queries")
+def get_slow_queries():
+    """Most recent statements over SLOW_QUERY_MS (empty unless it is set)."""
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "recorded": slow_queries.recorded,
+        "entries": slow_queries.entries(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of request, pool and cache metrics."""
+    pool = pool_status(engine)
+    cache_stats = cache.final_sessions.stats()
+    extra = {
+        "db_pool_checkouts_total": ("counter", pool["checkouts"]),
+        "db_pool_timeouts_total": ("counter", pool["timeouts"]),
+        "db_pool_wait_seconds_total": ("counter", pool["wait_seconds_total"]),
+        "db_pool_checked_out": ("gauge", pool.get("checked_out", 0)),
+        "db_pool_size": ("gauge", pool.get("size", 0)),
+        "db_pool_overflow": ("gauge", pool.get("overflow", 0)),
+        "session_cache_entries": ("gauge", cache_stats["entries"]),
+        "session_cache_bytes": ("gauge", cache_stats["size_bytes"]),
+        "session_cache_hits_total": ("counter", cache_stats["hits"]),
+        "session_cache_misses_total": ("counter", cache_stats["misses"]),
+        "session_cache_evictions_total": ("counter", cache_stats["evictions"]),
+        "sse_subscribers": ("gauge", events.hub.subscriber_count),
+        "sse_dropped_events_total": ("counter", events.hub.dropped),
+    }
+    return PlainTextResponse(
+        metrics.registry.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
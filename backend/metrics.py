@@ -0,0 +1,211 @@
+"""
+Per-route request metrics in Prometheus text format, served at /metrics.
+
+MetricsMiddleware opens a RequestStats for each HTTP request. Engine
+cursor hooks add each SQL statement and its time to it, a mapper hook
+counts the rows SELECTs load as ORM objects, and `serializing()` blocks time
+response encoding net of any lazy-load SQL inside them. When the request
+ends the totals are folded into per-(method, route) series.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+
+# long-lived streams and the scrape itself would only skew the histograms
+EXCLUDED_ROUTES = {"/metrics", "/sessions/events"}
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "rows", "db_seconds", "serialize_seconds")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RouteSeries:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.responses: dict[int, int] = {}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: dict[tuple[str, str], RouteSeries] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            series = self.routes.setdefault((method, route), RouteSeries())
+            series.latency.observe(seconds)
+            series.statements.observe(stats.statements)
+            series.rows += stats.rows
+            series.db_seconds += stats.db_seconds
+            series.serialize_seconds += stats.serialize_seconds
+            series.responses[status] = series.responses.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+    def render(self, extra: Optional[dict[str, tuple[str, float]]] = None) -> str:
+        out = []
+
+        def header(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, help_text, pick):
+            header(name, "histogram", help_text)
+            for (method, route), series in items:
+                hist = pick(series)
+                labels = f'method="{method}",route="{route}"'
+                for bound, count in zip(hist.buckets, hist.counts):
+                    out.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                out.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                out.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                out.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        def counter(name, help_text, pick):
+            header(name, "counter", help_text)
+            for (method, route), series in items:
+                out.append(f'{name}{{method="{method}",route="{route}"}} {pick(series)}')
+
+        with self._lock:
+            items = sorted(self.routes.items())
+            histogram("http_request_duration_seconds", "Request latency by route.", lambda s: s.latency)
+            histogram("http_request_db_statements", "SQL statements executed per request.",
+                      lambda s: s.statements)
+            counter("http_request_db_rows_total", "Rows loaded as ORM objects.", lambda s: s.rows)
+            counter("http_request_db_seconds_total", "Time spent executing SQL.", lambda s: s.db_seconds)
+            counter("http_request_serialize_seconds_total", "Time spent encoding responses, excluding SQL.",
+                    lambda s: s.serialize_seconds)
+            header("http_responses_total", "counter", "Responses by route and status code.")
+            for (method, route), series in items:
+                for status, count in sorted(series.responses.items()):
+                    out.append(f'http_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        for name, (kind, value) in (extra or {}).items():
+            out.append(f"# TYPE {name} {kind}")
+            out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses pass through untouched."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            path = route.path if route is not None else "<unmatched>"
+            if path not in EXCLUDED_ROUTES:
+                registry.record(scope["method"], path, status, time.perf_counter() - started, stats)
+
+
+def current_route() -> Optional[str]:
+    """The "METHOD /route/{template}" of the request being served, if any."""
+    stats = _current.get()
+    if stats is None or stats.scope is None:
+        return None
+    route = stats.scope.get("route")
+    return f"{stats.scope['method']} {route.path if route is not None else stats.scope['path']}"
+
+
+@contextmanager
+def serializing():
+    """Time a response-encoding block, minus SQL it triggers (lazy loads)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    db_before = stats.db_seconds
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.serialize_seconds += elapsed - (stats.db_seconds - db_before)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine):
+    """Attach the statement/time hooks to a (sync) engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@event.listens_for(Mapper, "load")
+def _count_rows(target, context):
+    # fires as each row becomes an object, so nothing is buffered and
+    # yield_per results keep streaming
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import (
+    DDL, Column, Integer, Float, String, Date, DateTime, ForeignKey, CheckConstraint, Index, event, func, text,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -19,28 +21,125 @@ class Session(Base):
         CheckConstraint("status IN ('scheduled','active','paused','completed','interrupted','abandoned','overdue')"),
         default="scheduled"
     )
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.current_timestamp())
+
+    # denormalized from interruptions, maintained by the crud transitions
+    pause_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_paused_seconds = Column(Float, nullable=False, default=0.0, server_default="0")
+    actual_duration_seconds = Column(Float, nullable=True)  # set on completion
+
+    # bumped from change_counter by every write, for /sessions/changes
+    version = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
     interruptions = relationship("Interruption", back_populates="session", cascade="all, delete-orphan")
+    # the pause still waiting for a resume, served by ix_interruptions_open
+    open_interruption = relationship(
+        "Interruption",
+        primaryjoin="and_(Session.id == Interruption.session_id, Interruption.resume_time.is_(None))",
+        viewonly=True,
+        uselist=False,
+    )
 
-    @property
-    def pause_count(self):
-        return len(self.interruptions)
+    __table_args__ = (
+        # keyset pagination for history
+        Index("ix_sessions_created_at_id", "created_at", "id"),
+        Index("ix_sessions_actual_duration_seconds", "actual_duration_seconds"),
+        # the handful of live sessions, for /sessions/current
+        Index(
+            "ix_sessions_live_status", "status",
+            sqlite_where=text("status IN ('scheduled','active','paused')"),
+            postgresql_where=text("status IN ('scheduled','active','paused')"),
+        ),
+    )
 
-    @property
-    def last_interruption(self):
-        if not self.interruptions:
-            return None
-        return max(self.interruptions, key=lambda x: x.pause_time)
+
+# SQLite compares DATETIME as text: the CURRENT_TIMESTAMP default and raw
+# datetime() inserts store whole seconds, SQLAlchemy binds '.ffffff', so pad
+# the short form or the history cursor repeats its boundary row (migration 011)
+CREATED_AT_TRIGGER = """
+CREATE TRIGGER sessions_created_at_micros AFTER INSERT ON sessions
+WHEN length(NEW.created_at) = 19
+BEGIN
+    UPDATE sessions SET created_at = NEW.created_at || '.000000' WHERE id = NEW.id;
+END
+"""
+event.listen(Session.__table__, "after_create", DDL(CREATED_AT_TRIGGER).execute_if(dialect="sqlite"))
+
+
+class ChangeCounter(Base):
+    """
+    Single-row counter that hands out session change versions.
+
+    Every write bumps this one row, so writes serialize on its lock until
+    they commit; that ordering is what keeps /sessions/changes gap-free.
+    """
+    __tablename__ = "change_counter"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)  # time of the last bump, for Last-Modified
+
+
+# seeded with the table, as migration 006 does, so writers only ever update it
+event.listen(ChangeCounter.__table__, "after_create", DDL("INSERT INTO change_counter (id, value) VALUES (1, 0)"))
+
+
+class DailyStats(Base):
+    """
+    Per-day rollup of finalized sessions, by start date; maintained by
+    complete_session and bulk import, rebuilt with `python -m analytics rebuild`.
+    Keyed by day alone while there are no users; (user_id, day) after that.
+    """
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    focus_seconds = Column(Float, nullable=False, default=0.0)
+    pauses = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    interrupted = Column(Integer, nullable=False, default=0)
+    abandoned = Column(Integer, nullable=False, default=0)
+    overdue = Column(Integer, nullable=False, default=0)
+
+
+def normalize_reason(text: str) -> str:
+    """Dictionary key for a pause reason: whitespace collapsed and case-folded."""
+    return " ".join(text.split()).casefold()
+
+
+class PauseReason(Base):
+    """Each distinct pause reason once; interruptions refer to it by id."""
+    __tablename__ = "pause_reasons"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False, unique=True)  # normalize_reason(label)
+    label = Column(String, nullable=False)  # first spelling seen, shown in responses
 
 
 class Interruption(Base):
     __tablename__ = "interruptions"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
-    reason = Column(String, nullable=False)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    reason_id = Column(Integer, ForeignKey("pause_reasons.id"), nullable=False)
     pause_time = Column(DateTime, default=datetime.utcnow)
     resume_time = Column(DateTime, nullable=True)
 
     session = relationship("Session", back_populates="interruptions")
+    # joined into whatever loads the interruption, so reading .reason is free
+    pause_reason = relationship("PauseReason", lazy="joined", innerjoin=True)
+
+    @property
+    def reason(self) -> str:
+        return self.pause_reason.label
+
+    __table_args__ = (
+        # open pauses only, for resume and complete to look up; not unique:
+        # pause_session's guarded active -> paused update keeps it to one
+        Index(
+            "ix_interruptions_open", "session_id",
+            sqlite_where=text("resume_time IS NULL"),
+            postgresql_where=text("resume_time IS NULL"),
+        ),
+    )
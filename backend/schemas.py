@@ -1,6 +1,28 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import date, datetime, timezone
+from typing import Optional, List, Literal
+
+
+SessionStatus = Literal[
+    "scheduled", "active", "paused", "completed", "interrupted", "abandoned", "overdue"
+]
+
+Granularity = Literal["day", "week", "month"]
+ExportFormat = Literal["csv", "ndjson"]
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware datetimes converted to UTC and made naive, as the database stores them."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def not_blank(value: str) -> str:
+    """Reasons are keyed with whitespace collapsed, so all-whitespace would be an empty key."""
+    if not value.strip():
+        raise ValueError("must not be blank")
+    return value
 
 
 class SessionCreate(BaseModel):
@@ -9,9 +31,67 @@ class SessionCreate(BaseModel):
     duration_minutes: int = Field(..., gt=0, le=480)  # max 8 hours
 
 
+class InterruptionImport(BaseModel):
+    reason: str = Field(..., min_length=1, max_length=500)
+    pause_time: datetime
+    resume_time: Optional[datetime] = None
+
+    _naive_utc = field_validator("pause_time", "resume_time", mode="after")(to_naive_utc)
+    _reason = field_validator("reason")(not_blank)
+
+
+class SessionImport(SessionCreate):
+    """A historical session for bulk import; aware times are stored as naive UTC, like the API."""
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    interruptions: List[InterruptionImport] = []
+
+    # before the timeline checks, which can't compare naive with aware values
+    _naive_utc = field_validator("start_time", "end_time", "created_at", mode="after")(to_naive_utc)
+
+    @model_validator(mode="after")
+    def check_timeline(self):
+        if self.end_time and not self.start_time:
+            raise ValueError("end_time requires start_time")
+        if self.start_time and self.end_time and self.end_time < self.start_time:
+            raise ValueError("end_time is before start_time")
+        if self.interruptions and not self.start_time:
+            raise ValueError("interruptions require start_time")
+
+        previous_end = self.start_time
+        for i, interruption in enumerate(self.interruptions):
+            if interruption.pause_time < previous_end:
+                raise ValueError(f"interruption {i} overlaps the previous one or starts before start_time")
+            if interruption.resume_time is None:
+                if i != len(self.interruptions) - 1:
+                    raise ValueError(f"interruption {i} is open but not the last one")
+                previous_end = interruption.pause_time
+            else:
+                if interruption.resume_time < interruption.pause_time:
+                    raise ValueError(f"interruption {i} resumes before it pauses")
+                previous_end = interruption.resume_time
+            if self.end_time and previous_end > self.end_time:
+                raise ValueError(f"interruption {i} extends past end_time")
+        return self
+
+
+class BulkImportError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    session_ids: List[int]
+    errors: List[BulkImportError]
+
+
 class PauseRequest(BaseModel):
     reason: str = Field(..., min_length=1, max_length=500)
 
+    _reason = field_validator("reason")(not_blank)
+
 
 class InterruptionResponse(BaseModel):
     id: int
@@ -52,3 +132,56 @@ class SessionListItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SessionChanges(BaseModel):
+    version: int  # pass back as `since` on the next call
+    has_more: bool
+    sessions: List[SessionListItem]
+
+
+class StatusCounts(BaseModel):
+    completed: int
+    interrupted: int
+    abandoned: int
+    overdue: int
+
+
+class SummaryTotals(BaseModel):
+    sessions: int
+    focus_minutes: float
+    by_status: StatusCounts
+    avg_pauses: float
+    overdue_ratio: float
+
+
+class SummaryPeriod(SummaryTotals):
+    period: date  # first day of the day/week/month
+
+
+class AnalyticsSummary(BaseModel):
+    start: datetime = Field(..., serialization_alias="from")
+    end: datetime = Field(..., serialization_alias="to")
+    granularity: Granularity
+    totals: SummaryTotals
+    periods: List[SummaryPeriod]
+
+
+class ReasonStat(BaseModel):
+    reason: str
+    count: int
+    minutes_lost: float
+
+
+class InterruptionAnalytics(BaseModel):
+    by_count: List[ReasonStat]
+    by_minutes: List[ReasonStat]
+
+
+class Heatmap(BaseModel):
+    """7x24 grids, Monday first, in local time at utc_offset_minutes."""
+    start: Optional[datetime] = Field(None, serialization_alias="from")
+    end: Optional[datetime] = Field(None, serialization_alias="to")
+    utc_offset_minutes: int
+    focus_minutes: List[List[float]]
+    interruptions: List[List[int]]
@@ -1,6 +1,15 @@
 -- Seed data for Deep Work Session Tracker
 -- Run this after migrations to populate test data
 
+-- Pause reason dictionary (key is the case-folded label)
+INSERT INTO pause_reasons (key, label) VALUES
+('quick standup meeting', 'Quick standup meeting'),
+('slack notification', 'Slack notification'),
+('coffee break', 'Coffee break'),
+('phone call', 'Phone call'),
+('email notification', 'Email notification'),
+('lunch break - got sidetracked', 'Lunch break - got sidetracked');
+
 -- Completed session (normal)
 INSERT INTO sessions (title, goal, scheduled_duration, start_time, end_time, status, created_at)
 VALUES ('API Design Review', 'Review and finalize REST API endpoints', 45, 
@@ -13,8 +22,8 @@ VALUES (2, 'Database Schema Planning', 'Design normalized schema for user data',
         datetime('now', '-2 days', '-70 minutes'), datetime('now', '-2 days'), 'completed',
         datetime('now', '-2 days', '-2 hours'));
 
-INSERT INTO interruptions (session_id, reason, pause_time, resume_time)
-VALUES (2, 'Quick standup meeting', datetime('now', '-2 days', '-40 minutes'), datetime('now', '-2 days', '-35 minutes'));
+INSERT INTO interruptions (session_id, reason_id, pause_time, resume_time)
+VALUES (2, (SELECT id FROM pause_reasons WHERE key = 'quick standup meeting'), datetime('now', '-2 days', '-40 minutes'), datetime('now', '-2 days', '-35 minutes'));
 
 -- Interrupted session (4+ pauses)
 INSERT INTO sessions (id, title, goal, scheduled_duration, start_time, end_time, status, created_at)
@@ -22,11 +31,11 @@ VALUES (3, 'Frontend Component Refactor', 'Refactor form components to use hooks
         datetime('now', '-1 day', '-100 minutes'), datetime('now', '-1 day'), 'interrupted',
         datetime('now', '-1 day', '-2 hours'));
 
-INSERT INTO interruptions (session_id, reason, pause_time, resume_time) VALUES 
-(3, 'Slack notification', datetime('now', '-1 day', '-90 minutes'), datetime('now', '-1 day', '-88 minutes')),
-(3, 'Coffee break', datetime('now', '-1 day', '-70 minutes'), datetime('now', '-1 day', '-60 minutes')),
-(3, 'Phone call', datetime('now', '-1 day', '-45 minutes'), datetime('now', '-1 day', '-40 minutes')),
-(3, 'Email notification', datetime('now', '-1 day', '-20 minutes'), datetime('now', '-1 day', '-18 minutes'));
+INSERT INTO interruptions (session_id, reason_id, pause_time, resume_time) VALUES 
+(3, (SELECT id FROM pause_reasons WHERE key = 'slack notification'), datetime('now', '-1 day', '-90 minutes'), datetime('now', '-1 day', '-88 minutes')),
+(3, (SELECT id FROM pause_reasons WHERE key = 'coffee break'), datetime('now', '-1 day', '-70 minutes'), datetime('now', '-1 day', '-60 minutes')),
+(3, (SELECT id FROM pause_reasons WHERE key = 'phone call'), datetime('now', '-1 day', '-45 minutes'), datetime('now', '-1 day', '-40 minutes')),
+(3, (SELECT id FROM pause_reasons WHERE key = 'email notification'), datetime('now', '-1 day', '-20 minutes'), datetime('now', '-1 day', '-18 minutes'));
 
 -- Overdue session (took >10% longer)
 INSERT INTO sessions (id, title, goal, scheduled_duration, start_time, end_time, status, created_at)
@@ -40,8 +49,8 @@ VALUES (5, 'Documentation Writing', 'Write API docs for auth endpoints', 60,
         datetime('now', '-6 hours', '-30 minutes'), datetime('now', '-6 hours'), 'abandoned',
         datetime('now', '-6 hours', '-1 hour'));
 
-INSERT INTO interruptions (session_id, reason, pause_time, resume_time)
-VALUES (5, 'Lunch break - got sidetracked', datetime('now', '-6 hours', '-20 minutes'), NULL);
+INSERT INTO interruptions (session_id, reason_id, pause_time, resume_time)
+VALUES (5, (SELECT id FROM pause_reasons WHERE key = 'lunch break - got sidetracked'), datetime('now', '-6 hours', '-20 minutes'), NULL);
 
 -- Scheduled session (not started yet)
 INSERT INTO sessions (title, goal, scheduled_duration, status, created_at)
@@ -50,3 +59,44 @@ VALUES ('Unit Test Coverage', 'Improve test coverage for auth module', 45, 'sche
 -- Active session 
 INSERT INTO sessions (title, goal, scheduled_duration, start_time, status, created_at)
 VALUES ('Bug Investigation', 'Debug memory leak in worker process', 60, datetime('now', '-15 minutes'), 'active', datetime('now', '-20 minutes'));
+
+-- Denormalized pause and duration columns, as the API maintains them: an
+-- unresumed pause on a finished session runs until its end
+UPDATE sessions SET
+    pause_count = (SELECT COUNT(*) FROM interruptions i WHERE i.session_id = sessions.id),
+    total_paused_seconds = COALESCE((
+        SELECT SUM((julianday(COALESCE(i.resume_time, sessions.end_time)) - julianday(i.pause_time)) * 86400)
+        FROM interruptions i
+        WHERE i.session_id = sessions.id AND COALESCE(i.resume_time, sessions.end_time) IS NOT NULL
+    ), 0);
+
+UPDATE sessions
+SET actual_duration_seconds = MAX((julianday(end_time) - julianday(start_time)) * 86400 - total_paused_seconds, 0)
+WHERE status IN ('completed', 'interrupted', 'abandoned', 'overdue')
+  AND start_time IS NOT NULL AND end_time IS NOT NULL;
+
+-- The daily_stats rollup the analytics read, as `python -m analytics rebuild`
+-- computes it; the API keeps it current from here on
+INSERT INTO daily_stats
+    (day, sessions, focus_seconds, pauses, completed, interrupted, abandoned, overdue)
+SELECT date(start_time), COUNT(*),
+       COALESCE(SUM(actual_duration_seconds), 0), COALESCE(SUM(pause_count), 0),
+       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'interrupted' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'abandoned' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN status = 'overdue' THEN 1 ELSE 0 END)
+FROM sessions
+WHERE start_time IS NOT NULL
+  AND status IN ('completed', 'interrupted', 'abandoned', 'overdue')
+GROUP BY date(start_time);
+
+-- Change versions past the counter's current value, in id order as migration
+-- 006 stamps existing rows, so /sessions/changes?since=0 replays the seed
+UPDATE sessions SET
+    version = (SELECT value FROM change_counter WHERE id = 1) + id,
+    updated_at = COALESCE(updated_at, end_time, start_time, created_at)
+WHERE version = 0;
+
+UPDATE change_counter
+SET value = (SELECT MAX(version) FROM sessions), updated_at = datetime('now')
+WHERE id = 1 AND value < (SELECT MAX(version) FROM sessions);
@@ -1,13 +1,35 @@
+import asyncio
+import csv
+import io
+import json
+import random
 import pytest
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, delete, event, exc, select
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from database import Base, get_db
+from database import (
+    Base, get_db, get_runner, get_session_factory, AsyncRunner, SlowQueryLog, record_slow_queries,
+    InstrumentedQueuePool, pool_status,
+)
 from main import app
-from models import Session, Interruption
+from models import Session, Interruption, ChangeCounter, DailyStats, PauseReason
+from schemas import SessionImport
+from loadtest.report import Recorder, compare, summarize
+from loadtest.server import wait_for_server
+from loadtest.workload import SessionPools, parse_mix
+import analytics
+import cache
+import crud
+import database
+import events
+import export
+import metrics
+from benchmarks import synthetic
 
 
 # test db setup
@@ -16,7 +38,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool
 )
-TestSession = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+TestSession = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 
 def override_get_db():
@@ -28,7 +50,50 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: TestSession
 client = TestClient(app)
+metrics.instrument_engine(engine)
+
+
+def run_seed():
+    """Apply seed_data.sql with raw SQL, as `sqlite3 deepwork.db < seed_data.sql` would."""
+    with open(Path(__file__).with_name("seed_data.sql")) as f:
+        script = f.read()
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.executescript(script)
+    finally:
+        raw.close()
+
+
+@contextmanager
+def count_statements():
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def query_plans(fn) -> list[list[str]]:
+    """EXPLAIN QUERY PLAN details of each SELECT that fn(db) runs."""
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    db = TestSession()
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+        db.close()
+    with engine.connect() as conn:
+        return [
+            [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for statement, parameters in statements
+            if statement.lstrip().upper().startswith("SELECT")
+        ]
 
 
 @pytest.fixture(autouse=True)
@@ -36,6 +101,8 @@ def setup_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # ids are reused once the tables are dropped
+    cache.final_sessions.clear()
 
 
 class TestSessionCreation:
@@ -104,6 +171,82 @@ class TestStateTransitions:
         resp = client.patch(f"/sessions/{sid}/resume")
         assert resp.status_code == 400
 
+    def test_transition_unknown_session(self):
+        resp = client.patch("/sessions/999/start")
+        assert resp.status_code == 404
+
+    def test_cannot_complete_twice(self):
+        resp = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30})
+        sid = resp.json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        client.patch(f"/sessions/{sid}/complete")
+
+        resp = client.patch(f"/sessions/{sid}/complete")
+        assert resp.status_code == 400
+        assert "Cannot complete session in 'completed' state" in resp.json()["detail"]
+
+    @contextmanager
+    def pause_lands_before_complete(self, times: int):
+        """Change pause_count right before complete's guarded UPDATE, the first `times` times."""
+        remaining = [times]
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            if remaining[0] and statement.startswith("UPDATE sessions") and "end_time=" in statement:
+                remaining[0] -= 1
+                cursor.connection.execute("UPDATE sessions SET pause_count = pause_count + 1")
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            yield
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    def test_complete_retries_after_a_concurrent_change(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        with self.pause_lands_before_complete(times=1):
+            resp = client.patch(f"/sessions/{sid}/complete")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "completed" and resp.json()["pause_count"] == 0
+
+    def test_complete_reports_a_conflict_when_it_keeps_losing(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        with self.pause_lands_before_complete(times=2):
+            resp = client.patch(f"/sessions/{sid}/complete")
+        assert resp.status_code == 409
+        assert "try again" in resp.json()["detail"]
+        assert client.get(f"/sessions/{sid}").json()["status"] == "active"
+
+    def test_resume_closes_only_open_interruption(self):
+        resp = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30})
+        sid = resp.json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "one"})
+        first = client.patch(f"/sessions/{sid}/resume").json()["interruptions"][0]["resume_time"]
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "two"})
+        resp = client.patch(f"/sessions/{sid}/resume")
+
+        ints = resp.json()["interruptions"]
+        assert ints[0]["resume_time"] == first
+        assert ints[1]["resume_time"] is not None
+
+    def test_transitions_do_not_refresh(self):
+        resp = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30})
+        sid = resp.json()["id"]
+
+        with count_statements() as statements:
+            resp = client.patch(f"/sessions/{sid}/start")
+        assert resp.json()["status"] == "active"
+        # change version bump plus the guarded UPDATE ... RETURNING
+        assert len(statements) == 2
+
+        with count_statements() as statements:
+            resp = client.patch(f"/sessions/{sid}/pause", json={"reason": "coffee"})
+        assert resp.json()["interruptions"][0]["reason"] == "coffee"
+        # version bump, guarded UPDATE, eager interruptions load, reason upsert, INSERT
+        assert len(statements) == 5
+
     def test_full_workflow(self):
         # create -> start -> pause -> resume -> complete
         resp = client.post("/sessions/", json={"title": "Full workflow", "duration_minutes": 30})
@@ -179,6 +322,320 @@ class TestStatusCalculation:
         db.close()
 
 
+class TestDenormalizedColumns:
+    def test_columns_maintained_on_transitions(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "coffee"})
+        client.patch(f"/sessions/{sid}/resume")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "call"})
+        resp = client.patch(f"/sessions/{sid}/complete")
+
+        db = TestSession()
+        session = db.get(Session, sid)
+        paused = sum(
+            ((i.resume_time or session.end_time) - i.pause_time).total_seconds()
+            for i in session.interruptions
+        )
+        assert session.pause_count == 2
+        assert session.total_paused_seconds == pytest.approx(paused)
+        worked = (session.end_time - session.start_time).total_seconds() - paused
+        assert session.actual_duration_seconds == pytest.approx(max(worked, 0))
+        assert resp.json()["actual_duration_minutes"] == pytest.approx(session.actual_duration_seconds / 60)
+        db.close()
+
+    def test_seed_script_fills_columns(self):
+        run_seed()
+        db = TestSession()
+        try:
+            seeded = {s.id: s for s in db.query(Session)}
+        finally:
+            db.close()
+        # 100 minutes with pauses of 2 + 10 + 5 + 2
+        assert seeded[3].pause_count == 4
+        assert seeded[3].total_paused_seconds == pytest.approx(19 * 60)
+        assert seeded[3].actual_duration_seconds == pytest.approx(81 * 60)
+        # the unresumed pause runs from minute 10 to the end at minute 30
+        assert seeded[5].pause_count == 1 and seeded[5].actual_duration_seconds == pytest.approx(10 * 60)
+        live = [s for s in seeded.values() if s.status == "active"]
+        assert live[0].pause_count == 0 and live[0].actual_duration_seconds is None
+
+
+class TestOpenInterruption:
+    def test_paused_session_reads_only_open_interruption(self):
+        sid = client.post("/sessions/", json={"title": "Bot", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        for i in range(3):
+            client.patch(f"/sessions/{sid}/pause", json={"reason": f"pause {i}"})
+            client.patch(f"/sessions/{sid}/resume")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "open"})
+
+        with count_statements() as statements:
+            resp = client.get("/sessions/history")
+        assert resp.json()[0]["actual_duration_minutes"] is not None
+        interruption_queries = [s for s in statements if "FROM interruptions" in s]
+        assert len(interruption_queries) == 1
+        assert "resume_time IS NULL" in interruption_queries[0]
+
+
+class TestBulkImport:
+    def test_bulk_import_with_history(self):
+        start = datetime(2024, 1, 10, 9, 0)
+        resp = client.post("/sessions/bulk", json=[
+            {"title": "Planned", "duration_minutes": 30},
+            {
+                "title": "Done", "duration_minutes": 30,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=35)).isoformat(),
+                "interruptions": [{
+                    "reason": "coffee",
+                    "pause_time": (start + timedelta(minutes=10)).isoformat(),
+                    "resume_time": (start + timedelta(minutes=15)).isoformat(),
+                }],
+            },
+            {
+                "title": "Walked away", "duration_minutes": 30,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=20)).isoformat(),
+                "interruptions": [{"reason": "lunch", "pause_time": (start + timedelta(minutes=5)).isoformat()}],
+            },
+        ])
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["created"] == 3 and body["errors"] == []
+
+        planned, done, walked = (client.get(f"/sessions/{sid}").json() for sid in body["session_ids"])
+        assert planned["status"] == "scheduled"
+        assert done["status"] == "completed"
+        assert done["pause_count"] == 1
+        assert done["actual_duration_minutes"] == pytest.approx(30)
+        assert walked["status"] == "abandoned"
+        assert walked["actual_duration_minutes"] == pytest.approx(5)
+
+    def test_bulk_import_reports_row_errors(self):
+        resp = client.post("/sessions/bulk", json=[
+            {"title": "Good", "duration_minutes": 30},
+            {"title": "", "duration_minutes": 30},
+            {"title": "Backwards", "duration_minutes": 30,
+             "start_time": "2024-01-10T10:00:00", "end_time": "2024-01-10T09:00:00"},
+        ])
+        body = resp.json()
+        assert body["created"] == 1
+        assert [e["index"] for e in body["errors"]] == [1, 2]
+        assert "end_time is before start_time" in body["errors"][1]["detail"]
+
+    def test_bulk_import_mixed_timezones(self):
+        resp = client.post("/sessions/bulk", json=[
+            {"title": "Mixed", "duration_minutes": 60,
+             "start_time": "2024-03-04T09:00:00Z", "end_time": "2024-03-04T11:00:00+01:00",
+             "interruptions": [{"reason": "call", "pause_time": "2024-03-04T09:05:00",
+                                "resume_time": "2024-03-04T09:10:00"}]},
+            # 10:00+02:00 is 08:00 UTC, before the naive start
+            {"title": "Backwards", "duration_minutes": 30,
+             "start_time": "2024-03-04T09:00:00", "end_time": "2024-03-04T10:00:00+02:00"},
+        ])
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [e["index"] for e in body["errors"]] == [1]
+        assert "end_time is before start_time" in body["errors"][0]["detail"]
+
+        session = client.get(f"/sessions/{body['session_ids'][0]}").json()
+        assert session["start_time"] == "2024-03-04T09:00:00"
+        assert session["end_time"] == "2024-03-04T10:00:00"
+        assert session["interruptions"][0]["pause_time"] == "2024-03-04T09:05:00"
+        assert session["actual_duration_minutes"] == pytest.approx(55)
+
+    def test_bulk_import_chunks(self):
+        db = TestSession()
+        records = [(i, SessionImport(title=f"S{i}", duration_minutes=30)) for i in range(5)]
+        ids, errors = crud.bulk_create_sessions(db, records, chunk_size=2)
+        titles = dict(db.execute(select(Session.id, Session.title)).all())
+        db.close()
+        assert errors == []
+        assert [titles[i] for i in ids] == ["S0", "S1", "S2", "S3", "S4"]
+
+    def test_bulk_import_reports_the_failing_record(self):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TRIGGER reject_s3 BEFORE INSERT ON sessions WHEN NEW.title = 'S3' "
+                "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            )
+        db = TestSession()
+        records = [(i, SessionImport(title=f"S{i}", duration_minutes=30)) for i in range(5)]
+        ids, errors = crud.bulk_create_sessions(db, records, chunk_size=2)
+        titles = dict(db.execute(select(Session.id, Session.title)).all())
+        db.close()
+        # S3 shares a chunk with S2, which still lands
+        assert errors == [(3, "Insert failed: IntegrityError")]
+        assert [titles[i] for i in ids] == ["S0", "S1", "S2", "S4"]
+
+
+class TestCurrentSession:
+    def test_no_current_session(self):
+        resp = client.get("/sessions/current")
+        assert resp.status_code == 200
+        assert resp.json() is None
+
+    def test_current_session_skips_finished(self):
+        done = client.post("/sessions/", json={"title": "Done", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{done}/start")
+        client.patch(f"/sessions/{done}/complete")
+        live = client.post("/sessions/", json={"title": "Live", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{live}/start")
+        client.patch(f"/sessions/{live}/pause", json={"reason": "call"})
+
+        resp = client.get("/sessions/current")
+        assert resp.json()["id"] == live
+        assert resp.json()["status"] == "paused"
+        assert resp.json()["interruptions"][0]["reason"] == "call"
+
+    def test_lookup_uses_partial_index(self):
+        # bound IN parameters would hide the partial index from SQLite's planner
+        plans = query_plans(crud.get_current_session)
+        assert plans
+        for plan in plans:
+            assert any("ix_sessions_live_status" in step for step in plan), plan
+
+
+class TestChanges:
+    def test_changes_since_version(self):
+        first = client.post("/sessions/", json={"title": "One", "duration_minutes": 30}).json()["id"]
+        resp = client.get("/sessions/history")
+        version = int(resp.headers["X-Change-Version"])
+
+        second = client.post("/sessions/", json={"title": "Two", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{first}/start")
+
+        resp = client.get(f"/sessions/changes?since={version}")
+        body = resp.json()
+        assert [s["id"] for s in body["sessions"]] == [second, first]
+        assert body["sessions"][1]["status"] == "active"
+        assert body["has_more"] is False
+
+        resp = client.get(f"/sessions/changes?since={body['version']}")
+        assert resp.json()["sessions"] == []
+        assert resp.json()["version"] == body["version"]
+
+    def test_counter_is_seeded_and_bumped_by_upsert(self):
+        db = TestSession()
+        try:
+            assert db.get(ChangeCounter, 1).value == 0
+            assert crud._bump_version(db, 3) == 3
+            db.commit()
+            # a database that lost the row gets it back instead of an IntegrityError
+            db.execute(delete(ChangeCounter))
+            assert crud._bump_version(db) == 1
+            assert crud._bump_version(db, 2) == 3
+            db.rollback()
+        finally:
+            db.close()
+
+    def test_failed_transition_does_not_bump_version(self):
+        sid = client.post("/sessions/", json={"title": "One", "duration_minutes": 30}).json()["id"]
+        version = client.get("/sessions/changes?since=0").json()["version"]
+        client.patch(f"/sessions/{sid}/resume")
+        assert client.get("/sessions/changes?since=0").json()["version"] == version
+
+    def test_changes_paging(self):
+        client.post("/sessions/bulk", json=[{"title": f"S{i}", "duration_minutes": 30} for i in range(5)])
+        resp = client.get("/sessions/changes?since=0&limit=3").json()
+        assert len(resp["sessions"]) == 3 and resp["has_more"] is True
+        resp = client.get(f"/sessions/changes?since={resp['version']}&limit=3").json()
+        assert [s["title"] for s in resp["sessions"]] == ["S3", "S4"]
+        assert resp["has_more"] is False
+
+    def test_seed_script_assigns_versions(self):
+        db = TestSession()
+        crud._bump_version(db, 10)
+        db.commit()
+        db.close()
+        run_seed()
+        body = client.get("/sessions/changes?since=10").json()
+        assert sorted(s["id"] for s in body["sessions"]) == list(range(1, 8))
+        # the next write lands after the seed
+        client.post("/sessions/", json={"title": "After", "duration_minutes": 30})
+        resp = client.get(f"/sessions/changes?since={body['version']}").json()
+        assert [s["title"] for s in resp["sessions"]] == ["After"]
+
+
+class TestConditionalRequests:
+    def test_session_detail_not_modified(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        resp = client.get(f"/sessions/{sid}")
+        etag = resp.headers["ETag"]
+        assert "Last-Modified" in resp.headers
+
+        with count_statements() as statements:
+            resp = client.get(f"/sessions/{sid}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert len(statements) == 1
+
+        client.patch(f"/sessions/{sid}/start")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "call"})
+        resp = client.get(f"/sessions/{sid}", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_active_session_has_no_etag(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        assert "ETag" not in client.get(f"/sessions/{sid}").headers
+        assert "ETag" not in client.get("/sessions/history").headers
+
+    def test_history_not_modified(self):
+        client.post("/sessions/", json={"title": "Test", "duration_minutes": 30})
+        etag = client.get("/sessions/history").headers["ETag"]
+        assert client.get("/sessions/history", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post("/sessions/", json={"title": "Another", "duration_minutes": 30})
+        resp = client.get("/sessions/history", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert len(resp.json()) == 2
+
+    def test_history_state_does_not_scan_sessions(self):
+        client.post("/sessions/", json={"title": "Test", "duration_minutes": 30})
+        plans = query_plans(crud.get_history_state)
+        assert plans
+        steps = [step for plan in plans for step in plan]
+        assert any("ix_sessions_live_status" in step for step in steps), steps
+        assert not any(step.startswith("SCAN sessions") for step in steps), steps
+
+
+class TestFinalSessionCache:
+    def test_completed_session_served_from_cache(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        completed = client.patch(f"/sessions/{sid}/complete").json()
+
+        with count_statements() as statements:
+            resp = client.get(f"/sessions/{sid}")
+        assert statements == []
+        assert resp.json() == completed
+        assert "immutable" in resp.headers["Cache-Control"]
+        assert cache.final_sessions.stats()["hits"] == 1
+
+        resp = client.get(f"/sessions/{sid}", headers={"If-None-Match": resp.headers["ETag"]})
+        assert resp.status_code == 304
+
+    def test_live_sessions_not_cached(self):
+        sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+        client.get(f"/sessions/{sid}")
+        assert cache.final_sessions.stats()["entries"] == 0
+        assert client.get(f"/sessions/{sid}").headers["Cache-Control"] == "no-cache"
+
+    def test_lru_evicts_by_size(self):
+        lru = cache.ByteLRUCache(max_bytes=10)
+        lru.put(1, b"aaaa", {})
+        lru.put(2, b"bbbb", {})
+        lru.get(1)
+        lru.put(3, b"cccc", {})
+        assert lru.get(2) is None
+        assert lru.get(1) is not None and lru.get(3) is not None
+        assert lru.stats()["evictions"] == 1
+        assert lru.stats()["size_bytes"] == 8
+
+
 class TestHistory:
     def test_get_history(self):
         # create a few sessions
@@ -196,3 +653,728 @@ class TestHistory:
         resp = client.get("/sessions/history")
         # should be newest first
         assert resp.json()[0]["title"] == "Second"
+
+    def test_history_pagination(self):
+        for i in range(5):
+            client.post("/sessions/", json={"title": f"Session {i}", "duration_minutes": 30})
+
+        resp = client.get("/sessions/history?limit=2")
+        assert [s["title"] for s in resp.json()] == ["Session 4", "Session 3"]
+        cursor = resp.headers["X-Next-Cursor"]
+
+        resp = client.get(f"/sessions/history?limit=2&before={cursor}")
+        assert [s["title"] for s in resp.json()] == ["Session 2", "Session 1"]
+
+        resp = client.get(f"/sessions/history?limit=2&after={resp.headers['X-Prev-Cursor']}")
+        assert [s["title"] for s in resp.json()] == ["Session 4", "Session 3"]
+        assert "X-Prev-Cursor" not in resp.headers
+
+    def test_pagination_over_whole_second_timestamps(self):
+        # rows stored by raw SQL: datetime() in the seed and the CURRENT_TIMESTAMP default
+        run_seed()
+        with engine.begin() as conn:
+            for title in ("Default A", "Default B"):
+                conn.exec_driver_sql(
+                    f"INSERT INTO sessions (title, scheduled_duration, status) VALUES ('{title}', 30, 'scheduled')"
+                )
+
+        pages, cursor = [], None
+        while True:
+            resp = client.get("/sessions/history", params={"limit": 3, "before": cursor} if cursor else {"limit": 3})
+            pages.append([s["id"] for s in resp.json()])
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        ids = [sid for page in pages for sid in page]
+        assert sorted(ids) == list(range(1, 10)), pages
+
+    def test_history_last_page_has_no_cursor(self):
+        client.post("/sessions/", json={"title": "Only", "duration_minutes": 30})
+        resp = client.get("/sessions/history?limit=2")
+        assert len(resp.json()) == 1
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_history_status_filter(self):
+        client.post("/sessions/", json={"title": "Scheduled", "duration_minutes": 30})
+        sid = client.post("/sessions/", json={"title": "Started", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+
+        resp = client.get("/sessions/history?status=active")
+        assert [s["title"] for s in resp.json()] == ["Started"]
+
+    def test_history_range_with_offset_is_utc(self):
+        for hour in (8, 9):
+            record = import_finished(datetime(2024, 1, 1, hour), 30)
+            record["title"], record["created_at"] = f"{hour}:00", datetime(2024, 1, 1, hour).isoformat()
+            assert client.post("/sessions/bulk", json=[record]).json()["errors"] == []
+
+        # 10:00+02:00 is 08:00 UTC
+        resp = client.get("/sessions/history", params={"from": "2024-01-01T10:00:00+02:00"})
+        assert [s["title"] for s in resp.json()] == ["9:00", "8:00"]
+        resp = client.get("/sessions/history", params={"from": "2024-01-01T09:30:00+01:00", "to": "2024-01-01T09:30:00"})
+        assert [s["title"] for s in resp.json()] == ["9:00"]
+
+    def test_history_invalid_cursor(self):
+        resp = client.get("/sessions/history?before=garbage")
+        assert resp.status_code == 400
+
+    def test_history_query_count_is_constant(self):
+        for i in range(5):
+            sid = client.post("/sessions/", json={"title": f"S{i}", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "break"})
+
+        with count_statements() as statements:
+            resp = client.get("/sessions/history")
+
+        assert all(s["pause_count"] == 1 for s in resp.json())
+        # change version read, the page, and one load of the open pauses
+        assert len(statements) == 3
+
+    def test_finished_history_page_skips_interruptions(self):
+        for i in range(5):
+            sid = client.post("/sessions/", json={"title": f"S{i}", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "break"})
+            client.patch(f"/sessions/{sid}/resume")
+            client.patch(f"/sessions/{sid}/complete")
+
+        with count_statements() as statements:
+            resp = client.get("/sessions/history")
+
+        assert all(s["pause_count"] == 1 for s in resp.json())
+        # change version read plus the page itself
+        assert len(statements) == 2
+        assert not any("interruptions" in s for s in statements)
+
+
+def import_finished(start: datetime, worked_minutes: int, scheduled: int = 30, pauses: int = 0,
+                    abandoned: bool = False) -> dict:
+    """A bulk-import record for a finalized session with one-minute pauses."""
+    interruptions = []
+    clock = start
+    for i in range(pauses):
+        clock += timedelta(minutes=1)
+        open_pause = abandoned and i == pauses - 1
+        interruptions.append({
+            "reason": "ping",
+            "pause_time": clock.isoformat(),
+            "resume_time": None if open_pause else (clock + timedelta(minutes=1)).isoformat(),
+        })
+        clock += timedelta(minutes=1)
+    end = start + timedelta(minutes=worked_minutes + pauses)
+    return {
+        "title": "Past", "duration_minutes": scheduled,
+        "start_time": start.isoformat(), "end_time": end.isoformat(),
+        "interruptions": interruptions,
+    }
+
+
+class TestAnalyticsSummary:
+    def seed(self):
+        resp = client.post("/sessions/bulk", json=[
+            import_finished(datetime(2024, 3, 4, 9), 30),                # Monday, completed
+            import_finished(datetime(2024, 3, 6, 9), 40, pauses=1),      # overdue
+            import_finished(datetime(2024, 3, 12, 9), 20, pauses=4),     # next week, interrupted
+            import_finished(datetime(2024, 4, 1, 9), 10, pauses=1, abandoned=True),
+        ])
+        assert resp.json()["errors"] == []
+        # live sessions are left out
+        sid = client.post("/sessions/", json={"title": "Live", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+
+    def test_weekly_summary(self):
+        self.seed()
+        resp = client.get("/analytics/summary", params={
+            "from": "2024-03-01T00:00:00", "to": "2024-05-01T00:00:00", "granularity": "week",
+        })
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["from"] == "2024-03-01T00:00:00" and body["granularity"] == "week"
+        assert [p["period"] for p in body["periods"]] == ["2024-03-04", "2024-03-11", "2024-04-01"]
+
+        first_week = body["periods"][0]
+        assert first_week["sessions"] == 2
+        assert first_week["focus_minutes"] == pytest.approx(70)
+        assert first_week["by_status"] == {"completed": 1, "interrupted": 0, "abandoned": 0, "overdue": 1}
+        assert first_week["avg_pauses"] == 0.5
+        assert first_week["overdue_ratio"] == 0.5
+
+        totals = body["totals"]
+        assert totals["sessions"] == 4
+        assert totals["by_status"] == {"completed": 1, "interrupted": 1, "abandoned": 1, "overdue": 1}
+        assert totals["avg_pauses"] == 1.5
+        assert totals["overdue_ratio"] == 0.25
+
+    def test_day_and_month_buckets_respect_range(self):
+        self.seed()
+        days = client.get("/analytics/summary", params={
+            "from": "2024-03-05T00:00:00", "to": "2024-03-31T00:00:00", "granularity": "day",
+        }).json()
+        assert [p["period"] for p in days["periods"]] == ["2024-03-06", "2024-03-12"]
+        months = client.get("/analytics/summary", params={
+            "from": "2024-01-01T00:00:00", "to": "2025-01-01T00:00:00", "granularity": "month",
+        }).json()
+        assert [(p["period"], p["sessions"]) for p in months["periods"]] == [("2024-03-01", 3), ("2024-04-01", 1)]
+
+    def test_offset_range_buckets_by_utc_day(self):
+        client.post("/sessions/bulk", json=[import_finished(datetime(2024, 2, 29, 23), 30)])
+        # 01:00 at +03:00 is still 29 February in UTC
+        body = client.get("/analytics/summary", params={
+            "from": "2024-03-01T01:00:00+03:00", "to": "2024-03-02T00:00:00+03:00",
+        }).json()
+        assert body["from"] == "2024-02-29T00:00:00" and body["to"] == "2024-03-02T00:00:00"
+        assert [(p["period"], p["sessions"]) for p in body["periods"]] == [("2024-02-29", 1)]
+
+    def test_rejects_empty_range(self):
+        resp = client.get("/analytics/summary", params={"from": "2024-03-05T00:00:00", "to": "2024-03-01T00:00:00"})
+        assert resp.status_code == 400
+
+
+class TestDailyStats:
+    def rows(self):
+        db = TestSession()
+        try:
+            return [
+                (r.day, r.sessions, round(r.focus_seconds), r.pauses, r.completed, r.interrupted, r.abandoned, r.overdue)
+                for r in db.query(DailyStats).order_by(DailyStats.day)
+            ]
+        finally:
+            db.close()
+
+    def test_complete_upserts_the_start_day(self):
+        for _ in range(2):
+            sid = client.post("/sessions/", json={"title": "Today", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "call"})
+            client.patch(f"/sessions/{sid}/resume")
+            client.patch(f"/sessions/{sid}/complete")
+        [(day, sessions, _, pauses, completed, *_)] = self.rows()
+        assert day == datetime.utcnow().date()
+        assert (sessions, pauses, completed) == (2, 2, 2)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        TestAnalyticsSummary().seed()
+        incremental = self.rows()
+        assert len(incremental) == 4
+
+        db = TestSession()
+        assert analytics.rebuild_daily_stats(db) == 4
+        db.commit()
+        db.close()
+        assert self.rows() == incremental
+
+    def test_seed_script_fills_the_rollup(self):
+        run_seed()
+        seeded = self.rows()
+        assert sum(day[1] for day in seeded) == 5
+
+        db = TestSession()
+        analytics.rebuild_daily_stats(db)
+        db.commit()
+        db.close()
+        assert self.rows() == seeded
+
+
+class TestPauseReasons:
+    def reasons(self):
+        db = TestSession()
+        try:
+            return [(r.key, r.label) for r in db.query(PauseReason).order_by(PauseReason.id)]
+        finally:
+            db.close()
+
+    def test_reasons_are_case_folded_into_one_row(self):
+        sid = client.post("/sessions/", json={"title": "Reasons", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        for reason in ["Slack", "  slack ", "SLACK  thread"]:
+            client.patch(f"/sessions/{sid}/pause", json={"reason": reason})
+            client.patch(f"/sessions/{sid}/resume")
+        assert self.reasons() == [("slack", "Slack"), ("slack thread", "SLACK thread")]
+        detail = client.get(f"/sessions/{sid}").json()
+        assert [i["reason"] for i in detail["interruptions"]] == ["Slack", "Slack", "SLACK thread"]
+
+    def test_bulk_import_maps_reasons(self):
+        record = import_finished(datetime(2024, 3, 4, 9), 30, pauses=3)
+        for interruption, reason in zip(record["interruptions"], ["Meeting", "meeting ", "Call"]):
+            interruption["reason"] = reason
+        assert client.post("/sessions/bulk", json=[record]).json()["errors"] == []
+        assert self.reasons() == [("meeting", "Meeting"), ("call", "Call")]
+
+    def test_existing_reason_is_not_rewritten(self):
+        db = TestSession()
+        try:
+            first = crud.get_pause_reason(db, "Standup")
+            db.commit()
+            changes = db.connection().connection.driver_connection.total_changes
+            again = crud.get_pause_reason(db, "  STANDUP")
+            assert again.id == first.id and again.label == "Standup"
+            assert db.connection().connection.driver_connection.total_changes == changes
+        finally:
+            db.close()
+
+    def test_blank_reasons_are_rejected(self):
+        sid = client.post("/sessions/", json={"title": "Reasons", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        assert client.patch(f"/sessions/{sid}/pause", json={"reason": "   "}).status_code == 422
+        record = import_finished(datetime(2024, 3, 4, 9), 30, pauses=1)
+        record["interruptions"][0]["reason"] = "\t"
+        result = client.post("/sessions/bulk", json=[record]).json()
+        assert result["created"] == 0 and result["errors"][0]["index"] == 0
+        assert self.reasons() == []
+
+    def test_top_reasons_by_count_and_minutes(self):
+        start = datetime(2024, 3, 4, 9)
+        frequent = import_finished(start, 30, pauses=3)                        # three one-minute pauses
+        long = import_finished(start + timedelta(days=1), 30, pauses=1)
+        long["interruptions"][0]["resume_time"] = (start + timedelta(days=1, minutes=11)).isoformat()
+        long["end_time"] = (start + timedelta(days=1, minutes=41)).isoformat()
+        unresumed = import_finished(start + timedelta(days=2), 10, pauses=1, abandoned=True)
+        for interruption in long["interruptions"] + unresumed["interruptions"]:
+            interruption["reason"] = "Meeting"
+        assert client.post("/sessions/bulk", json=[frequent, long, unresumed]).json()["errors"] == []
+
+        body = client.get("/analytics/interruptions").json()
+        assert body["by_count"] == [
+            {"reason": "ping", "count": 3, "minutes_lost": pytest.approx(3)},
+            # the abandoned pause runs from minute 1 until the session ended at minute 11
+            {"reason": "Meeting", "count": 2, "minutes_lost": pytest.approx(20)},
+        ]
+        assert [r["reason"] for r in body["by_minutes"]] == ["Meeting", "ping"]
+
+        top = client.get("/analytics/interruptions", params={"limit": 1, "from": "2024-03-05T00:00:00"}).json()
+        assert top["by_count"] == [{"reason": "Meeting", "count": 2, "minutes_lost": pytest.approx(20)}]
+        assert top["by_minutes"] == top["by_count"]
+
+    def test_range_with_offsets_is_compared_in_utc(self):
+        record = import_finished(datetime(2024, 3, 4, 9), 30, pauses=1)  # paused at 09:01 UTC
+        assert client.post("/sessions/bulk", json=[record]).json()["errors"] == []
+
+        # 10:30+02:00 is 08:30 UTC, before the pause
+        params = {"from": "2024-03-04T10:30:00+02:00", "to": "2024-03-05T00:00:00"}
+        resp = client.get("/analytics/interruptions", params=params)
+        assert resp.status_code == 200
+        assert [r["count"] for r in resp.json()["by_count"]] == [1]
+
+        params = {"from": "2024-03-05T01:00:00+02:00", "to": "2024-03-04T23:00:00"}
+        assert client.get("/analytics/interruptions", params=params).status_code == 400
+        params = {"from": "2024-03-04T09:00:00", "to": "2024-03-04T10:00:00+01:00"}
+        assert client.get("/analytics/interruptions", params=params).status_code == 400
+
+
+class TestHeatmap:
+    def test_splits_worked_time_across_hours_and_week_wrap(self):
+        resp = client.post("/sessions/bulk", json=[
+            import_finished(datetime(2024, 3, 4, 9, 30), 60, scheduled=60, pauses=1),  # Monday, pause 9:31-9:32
+            import_finished(datetime(2024, 3, 10, 23, 50), 20),                       # Sunday into Monday
+        ])
+        assert resp.json()["errors"] == []
+
+        body = client.get("/analytics/heatmap").json()
+        focus, pauses = body["focus_minutes"], body["interruptions"]
+        assert len(focus) == 7 and all(len(day) == 24 for day in focus)
+        assert focus[0][9] == pytest.approx(29) and focus[0][10] == pytest.approx(31)
+        assert focus[6][23] == pytest.approx(10) and focus[0][0] == pytest.approx(10)
+        assert sum(map(sum, focus)) == pytest.approx(80)
+        assert pauses[0][9] == 1 and sum(map(sum, pauses)) == 1
+
+    def test_utc_offset_and_range(self):
+        client.post("/sessions/bulk", json=[
+            import_finished(datetime(2024, 3, 4, 9, 30), 60, scheduled=60, pauses=1),
+            import_finished(datetime(2024, 3, 10, 23, 50), 20),
+        ])
+        body = client.get("/analytics/heatmap", params={
+            "from": "2024-03-10T00:00:00", "utc_offset_minutes": 120,
+        }).json()
+        assert body["from"] == "2024-03-10T00:00:00" and body["utc_offset_minutes"] == 120
+        focus = body["focus_minutes"]
+        assert focus[0][1] == pytest.approx(10) and focus[0][2] == pytest.approx(10)
+        assert sum(map(sum, focus)) == pytest.approx(20)
+        assert client.get("/analytics/heatmap", params={
+            "from": "2024-03-10T00:00:00", "to": "2024-03-01T00:00:00",
+        }).status_code == 400
+
+    def test_aware_range_is_echoed_and_filtered_in_utc(self):
+        client.post("/sessions/bulk", json=[
+            import_finished(datetime(2024, 3, 4, 9, 30), 60, scheduled=60),
+            import_finished(datetime(2024, 3, 10, 23, 50), 20),
+        ])
+        # 2024-03-10T01:00+02:00 is 23:00 UTC on the 9th, so only the Sunday session counts
+        body = client.get("/analytics/heatmap", params={
+            "from": "2024-03-10T01:00:00+02:00", "to": "2024-03-11T00:00:00",
+        }).json()
+        assert body["from"] == "2024-03-09T23:00:00"
+        assert sum(map(sum, body["focus_minutes"])) == pytest.approx(20)
+        assert client.get("/analytics/heatmap", params={
+            "from": "2024-03-11T01:00:00+02:00", "to": "2024-03-10T23:00:00",
+        }).status_code == 400
+
+
+class TestExport:
+    def seed(self):
+        resp = client.post("/sessions/bulk", json=[
+            import_finished(datetime(2024, 3, 4, 9), 30, pauses=2),
+            import_finished(datetime(2024, 3, 5, 9), 30),
+            import_finished(datetime(2024, 3, 6, 9), 10, pauses=1, abandoned=True),
+        ])
+        assert resp.json()["errors"] == []
+        sid = client.post("/sessions/", json={"title": "Live", "duration_minutes": 30}).json()["id"]
+        client.patch(f"/sessions/{sid}/start")
+        client.patch(f"/sessions/{sid}/pause", json={"reason": "Call"})
+
+    def test_ndjson_has_one_session_per_line(self):
+        self.seed()
+        resp = client.get("/sessions/export")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert [r["id"] for r in rows] == [1, 2, 3, 4]
+        assert [len(r["interruptions"]) for r in rows] == [2, 0, 1, 1]
+        assert rows[0]["start_time"] == "2024-03-04T09:00:00"
+        assert rows[0]["interruptions"][0] == {
+            "id": 1, "reason": "ping", "pause_time": "2024-03-04T09:01:00", "resume_time": "2024-03-04T09:02:00",
+        }
+        live = rows[3]
+        assert live["status"] == "paused" and live["end_time"] is None
+        assert live["interruptions"][0]["reason"] == "Call" and live["interruptions"][0]["resume_time"] is None
+
+    def test_csv_inlines_interruptions_as_json(self):
+        self.seed()
+        resp = client.get("/sessions/export", params={"format": "csv"})
+        assert resp.headers["content-type"] == "text/csv; charset=utf-8"
+        assert resp.headers["content-disposition"] == 'attachment; filename="sessions.csv"'
+        rows = list(csv.DictReader(io.StringIO(resp.text)))
+        assert [r["id"] for r in rows] == ["1", "2", "3", "4"]
+        assert rows[1]["goal"] == "" and rows[3]["end_time"] == ""
+        assert [i["reason"] for i in json.loads(rows[0]["interruptions"])] == ["ping", "ping"]
+
+    def test_csv_quotes_line_breaks_in_titles(self):
+        record = import_finished(datetime(2024, 3, 4, 9), 30)
+        record["title"], record["goal"] = "Two\nlines", 'Say "done",\r\nthen stop'
+        assert client.post("/sessions/bulk", json=[record]).json()["errors"] == []
+        text = client.get("/sessions/export", params={"format": "csv"}).text
+        rows = list(csv.DictReader(io.StringIO(text, newline="")))
+        assert len(rows) == 1
+        assert rows[0]["title"] == "Two\nlines" and rows[0]["goal"] == 'Say "done",\r\nthen stop'
+
+    def test_batches_keep_interruptions_with_their_session(self):
+        self.seed()
+        db = TestSession()
+        try:
+            batches = list(export.iter_batches(db, batch_size=2))
+        finally:
+            db.close()
+        assert [[s["id"] for s in batch] for batch in batches] == [[1, 2], [3, 4]]
+        assert [len(s["interruptions"]) for batch in batches for s in batch] == [2, 0, 1, 1]
+
+    def test_rejects_unknown_format(self):
+        assert client.get("/sessions/export", params={"format": "xml"}).status_code == 422
+
+
+class TestPoolStatus:
+    def test_pool_status(self):
+        resp = client.get("/debug/pool")
+        assert resp.status_code == 200
+        assert {"checkouts", "timeouts", "wait_seconds_total"} <= resp.json().keys()
+
+    def test_counts_held_connections_and_timeouts(self, tmp_path):
+        pool_engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+            pool_size=1, max_overflow=1, pool_timeout=0.05,
+        )
+        before = pool_status(pool_engine)
+        first, second = pool_engine.connect(), pool_engine.connect()
+        try:
+            status = pool_status(pool_engine)
+            assert (status["checked_out"], status["overflow"], status["size"]) == (2, 1, 1)
+            assert status["checkouts"] - before["checkouts"] == 2
+            with pytest.raises(exc.TimeoutError):
+                pool_engine.connect()
+            assert pool_status(pool_engine)["timeouts"] - before["timeouts"] == 1
+        finally:
+            first.close()
+            second.close()
+        assert pool_status(pool_engine)["checked_out"] == 0
+        pool_engine.dispose()
+
+    def test_connect_errors_are_not_timeouts(self, tmp_path):
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}", poolclass=InstrumentedQueuePool)
+        before = pool_status(broken)["timeouts"]
+        with pytest.raises(exc.OperationalError):
+            broken.connect()
+        assert pool_status(broken)["timeouts"] == before
+
+
+class TestMetrics:
+    def setup_method(self):
+        metrics.registry.reset()
+
+    def test_records_route_latency_statements_and_rows(self):
+        sid = client.post("/sessions/", json={"title": "Metered", "duration_minutes": 30}).json()["id"]
+        client.get(f"/sessions/{sid}")
+        client.get(f"/sessions/{sid}")
+
+        series = metrics.registry.routes[("GET", "/sessions/{session_id}")]
+        assert series.latency.count == 2
+        # state read plus the session and its interruptions; only the session is an object
+        assert series.statements.sum == 6
+        assert series.rows == 2
+        assert series.db_seconds > 0
+        assert series.serialize_seconds > 0
+        assert series.responses == {200: 2}
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        client.get("/sessions/999")
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        text = resp.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/sessions/{session_id}"} 1' in text
+        assert 'http_responses_total{method="GET",route="/sessions/{session_id}",status="404"} 1' in text
+        assert "session_cache_hits_total" in text
+        assert "db_pool_checkouts_total" in text
+        assert 'route="/metrics"' not in text
+
+    def test_render_without_extra(self):
+        assert metrics.registry.render().endswith("\n")
+
+    def test_row_count_does_not_buffer_streamed_results(self):
+        client.post("/sessions/bulk", json=[{"title": f"S{i}", "duration_minutes": 30} for i in range(5)])
+        stats = metrics.RequestStats()
+        token = metrics._current.set(stats)
+        db = TestSession()
+        try:
+            result = db.execute(select(Session).order_by(Session.id), execution_options={"yield_per": 2})
+            first = next(result.partitions())
+            assert len(first) == 2 and stats.rows == 2
+            assert len(result.all()) == 3 and stats.rows == 5
+        finally:
+            db.close()
+            metrics._current.reset(token)
+
+
+class TestSlowQueries:
+    def test_records_statement_route_and_plan(self, tmp_path):
+        slow_engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+        Base.metadata.create_all(bind=slow_engine)
+        log = SlowQueryLog(maxlen=3)
+        record_slow_queries(slow_engine, threshold_ms=0, log=log)
+        SlowSession = sessionmaker(bind=slow_engine, expire_on_commit=False)
+
+        def override():
+            with SlowSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override
+        try:
+            client.post("/sessions/", json={"title": "Slow", "duration_minutes": 30})
+            client.get("/sessions/history", params={"status": "completed"})
+        finally:
+            app.dependency_overrides[get_db] = override_get_db
+
+        entries = log.entries()
+        assert len(entries) == 3 and log.recorded > 3
+        page = entries[-1]
+        assert page["route"] == "GET /sessions/history"
+        assert page["statement"].startswith("SELECT")
+        assert "completed" in page["parameters"]
+        assert any("ix_sessions" in step for step in page["plan"])
+
+    def test_failed_explain_on_postgres_rolls_back_to_a_savepoint(self):
+        executed = []
+
+        class Cursor:
+            def execute(self, sql, parameters=None):
+                executed.append(sql)
+                if sql.startswith("EXPLAIN"):
+                    raise RuntimeError("cannot EXPLAIN")
+
+            def close(self):
+                pass
+
+        dbapi = type("Dbapi", (), {"cursor": lambda self: Cursor()})()
+        conn = type("Conn", (), {
+            "dialect": type("Dialect", (), {"name": "postgresql"}),
+            "connection": type("Fairy", (), {"dbapi_connection": dbapi}),
+        })()
+
+        # the request's transaction stays usable after the failure
+        assert database._explain(conn, "SELECT 1", {}) == ["EXPLAIN failed: cannot EXPLAIN"]
+        assert executed == [
+            "SAVEPOINT slow_query_explain", "EXPLAIN SELECT 1", "ROLLBACK TO SAVEPOINT slow_query_explain",
+        ]
+
+    def test_endpoint_disabled_by_default(self):
+        resp = client.get("/debug/slow-queries")
+        assert resp.json() == {"threshold_ms": None, "recorded": 0, "entries": []}
+
+
+class TestAsyncMode:
+    def test_full_workflow_on_async_session(self, tmp_path):
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        url = f"sqlite:///{tmp_path / 'async.db'}"
+        Base.metadata.create_all(bind=create_engine(url))
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        AsyncTestSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_runner():
+            async with AsyncTestSession() as db:
+                yield AsyncRunner(db)
+
+        app.dependency_overrides[get_runner] = override_get_runner
+        try:
+            sid = client.post("/sessions/", json={"title": "Async", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "coffee"})
+            client.patch(f"/sessions/{sid}/resume")
+            resp = client.patch(f"/sessions/{sid}/complete")
+            assert resp.json()["status"] == "completed"
+            assert resp.json()["interruptions"][0]["reason"] == "coffee"
+            assert [s["id"] for s in client.get("/sessions/history").json()] == [sid]
+        finally:
+            del app.dependency_overrides[get_runner]
+
+
+class RecordingFanout(events.LocalFanout):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, event):
+        self.published.append(event)
+        super().publish(event)
+
+
+class TestEvents:
+    def test_transitions_publish_events(self):
+        backend = RecordingFanout()
+        original = events.hub.backend
+        events.hub.set_backend(backend)
+        try:
+            sid = client.post("/sessions/", json={"title": "Test", "duration_minutes": 30}).json()["id"]
+            client.patch(f"/sessions/{sid}/start")
+            client.patch(f"/sessions/{sid}/pause", json={"reason": "call"})
+            client.patch(f"/sessions/{sid}/resume")
+            client.patch(f"/sessions/{sid}/resume")  # rejected, no event
+            client.patch(f"/sessions/{sid}/complete")
+        finally:
+            events.hub.set_backend(original)
+
+        assert [e["type"] for e in backend.published] == [
+            "created", "started", "paused", "resumed", "completed"
+        ]
+        assert backend.published[2]["pause_count"] == 1
+        assert backend.published[-1]["status"] == "completed"
+
+    def test_stream_delivers_events(self):
+        async def scenario():
+            stream = events.sse_stream(lambda: asyncio.sleep(0, result=False), heartbeat=0.05)
+            assert await stream.__anext__() == b"retry: 3000\n\n"
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            events.hub.publish({"type": "started", "id": 1, "status": "active", "version": 7})
+            chunk = await pending
+            heartbeat = await stream.__anext__()
+            await stream.aclose()
+            return chunk, heartbeat
+
+        chunk, heartbeat = asyncio.run(scenario())
+        assert chunk.startswith(b"id: 7\nevent: started\ndata: {")
+        assert heartbeat == b": keepalive\n\n"
+        assert events.hub.subscriber_count == 0
+
+    def test_slow_subscriber_is_coalesced(self):
+        hub = events.EventHub(queue_size=3)
+
+        async def scenario():
+            queue = hub.subscribe()
+            for version in range(1, 6):
+                hub.publish({"type": "paused", "id": 1, "version": version})
+            await asyncio.sleep(0)
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        received = asyncio.run(scenario())
+        assert received[0] == {"type": "resync", "version": 4}
+        assert received[1]["version"] == 5
+        assert hub.dropped == 3
+
+
+class TestSyntheticData:
+    @staticmethod
+    def load(path, workers):
+        bulk = create_engine(f"sqlite:///{path}")
+        counts = synthetic.generate(bulk, 300, seed=7, batch_size=64, workers=workers)
+        with bulk.connect() as conn:
+            tables = {
+                name: conn.exec_driver_sql(f"SELECT * FROM {name} ORDER BY 1, 2").all()
+                for name in ("sessions", "interruptions", "pause_reasons", "daily_stats")
+            }
+            version = conn.exec_driver_sql("SELECT value FROM change_counter").scalar_one()
+        bulk.dispose()
+        return counts, tables, version
+
+    def test_same_seed_gives_same_rows(self, tmp_path):
+        counts, tables, version = self.load(tmp_path / "a.db", workers=1)
+        assert self.load(tmp_path / "b.db", workers=2) == (counts, tables, version)
+        assert counts["sessions"] == len(tables["sessions"]) == version == 300
+        assert counts["interruptions"] == len(tables["interruptions"]) > 0
+        assert [row.version for row in tables["sessions"]] == list(range(1, 301))
+
+
+class TestLoadtestReport:
+    def test_percentiles_interpolate_between_samples(self):
+        recorder = Recorder()
+        for ms in range(1, 101):
+            recorder.record("GET /a", ms / 1000, 200)
+        recorder.record("GET /b", 0.25, 404)
+        recorder.record_error("GET /c")
+
+        report = summarize(recorder, elapsed=2, config={"seed": 0})
+        a = report["endpoints"]["GET /a"]
+        assert (a["p50_ms"], a["p95_ms"], a["p99_ms"], a["max_ms"]) == (50.5, 95.05, 99.01, 100.0)
+        assert a["requests"] == 100 and a["rps"] == 50
+        assert report["endpoints"]["GET /b"]["p99_ms"] == 250.0
+        assert report["endpoints"]["GET /b"]["statuses"] == {"404": 1}
+        assert report["endpoints"]["GET /c"] == {"requests": 0, "rps": 0, "errors": 1, "statuses": {}}
+        assert report["total"]["requests"] == 101
+        assert report["total"]["errors"] == 1
+        assert report["total"]["max_ms"] == 250.0
+
+    def test_compare_reports_relative_change(self):
+        before = {"total": {"rps": 100, "p50_ms": 10, "p95_ms": 20, "p99_ms": 40},
+                  "endpoints": {"GET /a": {"rps": 50, "p50_ms": 0}, "GET /gone": {"rps": 1}}}
+        after = {"total": {"rps": 125, "p50_ms": 5, "p95_ms": 20, "p99_ms": 30},
+                 "endpoints": {"GET /a": {"rps": 40, "p50_ms": 4}, "GET /new": {"rps": 9}}}
+
+        header, total, a = compare(before, after).splitlines()
+        assert header.split() == ["endpoint", "rps", "p50_ms", "p95_ms", "p99_ms"]
+        assert "100 -> 125 (+25%)" in total and "10 -> 5 (-50%)" in total
+        assert "20 -> 20 (+0%)" in total and "40 -> 30 (-25%)" in total
+        # a zero or missing baseline has no ratio
+        assert a.split()[:5] == ["GET", "/a", "50", "->", "40"]
+        assert a.split()[6:] == ["-", "-", "-"]
+
+    def test_parse_mix(self):
+        mix = parse_mix("create=2, detail=0.5,")
+        assert mix["create"] == 2 and mix["detail"] == 0.5 and mix["history"] == 0
+        with pytest.raises(ValueError, match="Unknown operation 'delete'"):
+            parse_mix("delete=1")
+        with pytest.raises(ValueError, match="positive weight"):
+            parse_mix("create=0")
+
+    def test_session_pools_hand_out_each_id_once(self):
+        pools = SessionPools()
+        for sid in (1, 2, 3):
+            pools.put(sid, "scheduled")
+        pools.put(4, "completed")
+        rng = random.Random(0)
+
+        taken = {pools.take(rng, "scheduled", "active")[0] for _ in range(3)}
+        assert taken == {1, 2, 3}
+        assert pools.take(rng, "scheduled", "active") == (None, None)
+        assert pools.any_id(rng) == 4
+
+    def test_wait_for_server_gives_up(self):
+        with pytest.raises(RuntimeError, match="did not start"):
+            wait_for_server("http://127.0.0.1:9", timeout=0)
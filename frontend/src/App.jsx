@@ -1,36 +1,48 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import SessionForm from './components/SessionForm';
 import SessionControl from './components/SessionControl';
 import SessionHistory from './components/SessionHistory';
 import {
     createSession,
     getHistory,
+    getChanges,
+    getCurrentSession,
     getSession,
     startSession,
     pauseSession,
     resumeSession,
-    completeSession
+    completeSession,
+    openSessionEvents
 } from './api';
 
+// apply /sessions/changes results to the newest-first history list
+const mergeSessions = (list, changed) => {
+    const byId = new Map(changed.map(s => [s.id, s]));
+    const known = new Set(list.map(s => s.id));
+    const added = changed.filter(s => !known.has(s.id)).reverse();
+    return [...added, ...list.map(s => byId.get(s.id) ?? s)];
+};
+
 export default function App() {
     const [sessions, setSessions] = useState([]);
     const [activeSession, setActiveSession] = useState(null);
     const [error, setError] = useState(null);
     const [loading, setLoading] = useState(true);
+    // X-Next-Cursor of the oldest page loaded, or null once history is exhausted
+    const [nextCursor, setNextCursor] = useState(null);
+    const versionRef = useRef(0);
 
     const fetchHistory = useCallback(async () => {
         try {
-            const { data } = await getHistory();
+            const [{ data, headers }, { data: current }] = await Promise.all([
+                getHistory(),
+                getCurrentSession()
+            ]);
+            versionRef.current = Number(headers['x-change-version'] ?? 0);
             setSessions(data);
-
-            // find any active/paused/scheduled session
-            const current = data.find(s => ['active', 'paused', 'scheduled'].includes(s.status));
-            if (current) {
-                const { data: full } = await getSession(current.id);
-                setActiveSession(full);
-            } else {
-                setActiveSession(null);
-            }
+            setNextCursor(headers['x-next-cursor'] ?? null);
+            // the active/paused/scheduled session, or null
+            setActiveSession(current);
             setError(null);
         } catch (err) {
             setError('Failed to load sessions. Is the backend running?');
@@ -43,11 +55,48 @@ export default function App() {
         fetchHistory();
     }, [fetchHistory]);
 
+    // older sessions, one page at a time
+    const loadMore = async () => {
+        try {
+            const { data, headers } = await getHistory({ before: nextCursor });
+            // a change synced in meanwhile may already have added some of them
+            setSessions(prev => {
+                const known = new Set(prev.map(s => s.id));
+                return [...prev, ...data.filter(s => !known.has(s.id))];
+            });
+            setNextCursor(headers['x-next-cursor'] ?? null);
+        } catch (err) {
+            setError('Failed to load older sessions');
+        }
+    };
+
+    // pull only the sessions changed since the last sync
+    const syncChanges = useCallback(async () => {
+        let hasMore = true;
+        while (hasMore) {
+            const { data } = await getChanges(versionRef.current);
+            versionRef.current = data.version;
+            hasMore = data.has_more;
+            if (data.sessions.length) {
+                setSessions(prev => mergeSessions(prev, data.sessions));
+            }
+        }
+    }, []);
+
+    // changes made elsewhere (other tabs, dashboards) arrive over SSE
+    useEffect(() => {
+        const source = openSessionEvents();
+        const onChange = () => syncChanges().catch(() => {});
+        const types = ['created', 'started', 'paused', 'resumed', 'completed', 'resync'];
+        types.forEach(type => source.addEventListener(type, onChange));
+        return () => source.close();
+    }, [syncChanges]);
+
     const handleCreate = async (data) => {
         try {
             const { data: session } = await createSession(data);
             setActiveSession(session);
-            await fetchHistory();
+            await syncChanges();
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to create session');
         }
@@ -57,7 +106,7 @@ export default function App() {
         try {
             const { data } = await startSession(activeSession.id);
             setActiveSession(data);
-            await fetchHistory();
+            await syncChanges();
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to start session');
         }
@@ -67,7 +116,7 @@ export default function App() {
         try {
             const { data } = await pauseSession(activeSession.id, reason);
             setActiveSession(data);
-            await fetchHistory();
+            await syncChanges();
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to pause session');
         }
@@ -77,7 +126,7 @@ export default function App() {
         try {
             const { data } = await resumeSession(activeSession.id);
             setActiveSession(data);
-            await fetchHistory();
+            await syncChanges();
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to resume session');
         }
@@ -87,7 +136,7 @@ export default function App() {
         try {
             await completeSession(activeSession.id);
             setActiveSession(null);
-            await fetchHistory();
+            await syncChanges();
         } catch (err) {
             setError(err.response?.data?.detail || 'Failed to complete session');
         }
@@ -138,6 +187,7 @@ export default function App() {
                     <SessionHistory
                         sessions={sessions}
                         onSelectSession={handleSelectSession}
+                        onLoadMore={nextCursor ? loadMore : null}
                     />
                 </div>
             </main>
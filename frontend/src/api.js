@@ -1,16 +1,22 @@
 import axios from 'axios';
 
+const BASE_URL = 'http://localhost:8000';
+
 const api = axios.create({
-    baseURL: 'http://localhost:8000',
+    baseURL: BASE_URL,
     headers: { 'Content-Type': 'application/json' }
 });
 
 export const createSession = (data) => api.post('/sessions/', data);
-export const getHistory = () => api.get('/sessions/history');
+export const getHistory = (params = {}) => api.get('/sessions/history', { params });
+export const getChanges = (since) => api.get('/sessions/changes', { params: { since } });
+export const getCurrentSession = () => api.get('/sessions/current');
 export const getSession = (id) => api.get(`/sessions/${id}`);
 export const startSession = (id) => api.patch(`/sessions/${id}/start`);
 export const pauseSession = (id, reason) => api.patch(`/sessions/${id}/pause`, { reason });
 export const resumeSession = (id) => api.patch(`/sessions/${id}/resume`);
 export const completeSession = (id) => api.patch(`/sessions/${id}/complete`);
 
+export const openSessionEvents = () => new EventSource(`${BASE_URL}/sessions/events`);
+
 export default api;
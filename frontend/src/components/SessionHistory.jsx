@@ -8,7 +8,7 @@ const STATUS_LABELS = {
     overdue: 'Overdue'
 };
 
-export default function SessionHistory({ sessions, onSelectSession }) {
+export default function SessionHistory({ sessions, onSelectSession, onLoadMore }) {
     const formatDuration = (mins) => {
         if (mins < 60) return `${Math.round(mins)}m`;
         const h = Math.floor(mins / 60);
@@ -74,6 +74,9 @@ export default function SessionHistory({ sessions, onSelectSession }) {
                     ))}
                 </tbody>
             </table>
+            {onLoadMore && (
+                <button className="load-more" onClick={onLoadMore}>Load more</button>
+            )}
         </div>
     );
 }